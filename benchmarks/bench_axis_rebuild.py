@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Benchmark of the arithmetic time axis rebuild against the date round trip.
+
+    For fixed-length units sharing the same reference date, the theoretical time axis is rebuilt by scaling
+    the axis in frequency units. It is compared with the former conversion through dates for several
+    frequencies. Both rebuilt axes must be equal once truncated as for the axis comparison.
+
+    Usage: python benchmarks/bench_axis_rebuild.py [--years 10] [--frequencies 1hr 3hr 6hr day] [--calendars ...]
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nctime.axis.constants import NDECIMALS
+from nctime.utils.constants import FREQ_INC, SECONDS_PER_UNIT
+from nctime.utils.time import convert_time_units, date2num, num2date, num2num, trunc
+
+REF_UNITS = 'days since 1850-01-01 00:00:00'
+
+
+def rebuild(frequency, calendar, years):
+    """
+    Rebuilds an averaged time axis of several years for the frequency, with both methods.
+
+    :param str frequency: The time frequency
+    :param str calendar: The NetCDF calendar attribute
+    :param int years: The number of years of the axis
+    :returns: The elapsed times and the rebuilt axes of the arithmetic and round trip methods
+    :rtype: *tuple*
+
+    """
+    step, step_units = FREQ_INC[('None', frequency)]
+    funits = convert_time_units(REF_UNITS, 'None', frequency)
+    length = int(years * 365 * 86400 / (step * SECONDS_PER_UNIT[step_units]))
+    num_axis = 0.5 * step + np.arange(length) * step
+    start = time.time()
+    arithmetic = num2num(num_axis, units=funits, new_units=REF_UNITS, calendar=calendar)
+    arithmetic_time = time.time() - start
+    start = time.time()
+    round_trip = date2num(num2date(num_axis, units=funits, calendar=calendar), units=REF_UNITS, calendar=calendar)
+    round_trip_time = time.time() - start
+    return (arithmetic_time, arithmetic), (round_trip_time, round_trip)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the time axis rebuild.')
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--frequencies', nargs='+', default=['1hr', '3hr', '6hr', 'day'])
+    parser.add_argument('--calendars', nargs='+', default=['standard', 'noleap', '360_day'])
+    args = parser.parse_args()
+    print 'Axes of {} years in "{}"'.format(args.years, REF_UNITS)
+    for frequency in args.frequencies:
+        for calendar in args.calendars:
+            (arithmetic_time, arithmetic), (round_trip_time, round_trip) = rebuild(frequency, calendar, args.years)
+            assert np.array_equal(trunc(arithmetic, NDECIMALS), trunc(round_trip, NDECIMALS)), \
+                'Axes differ for {} in {} calendar'.format(frequency, calendar)
+            print '{:>4s} {:>9s} {:8d} steps: arithmetic {:.3f}s, round trip {:.3f}s ({:.0f}x)'.format(
+                frequency, calendar, len(arithmetic), arithmetic_time, round_trip_time,
+                round_trip_time / max(arithmetic_time, 1e-6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Benchmark of the cutting timestep lookup of the partial overlaps.
+
+    A chain of deflated files with a regular time axis, each one partially overlapping the next one, is written
+    into a temporary directory. The time step following the last step of each file is looked up into the next
+    file with a full time axis scan, with a binary search only and with the guessed index from the time axis
+    endpoints. The cutting timesteps must be the same whatever the lookup.
+
+    Usage: python benchmarks/bench_cutting_timestep.py [--files 50] [--length 87600] [--overlap 8760]
+
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import netCDF4
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nctime.utils.time import get_next_timestep
+
+
+def make_files(root, files, length, overlap):
+    """
+    Writes the chain of partially overlapping files.
+
+    :param str root: The directory to write into
+    :param int files: The number of files
+    :param int length: The time axis length of each file
+    :param int overlap: The number of time steps shared by two consecutive files
+    :returns: The files full paths with their first and last time steps
+    :rtype: *list*
+
+    """
+    chain = list()
+    for i in range(files):
+        ffp = os.path.join(root, 'f{:04d}.nc'.format(i))
+        axis = np.arange(length, dtype=np.float64) + i * (length - overlap)
+        nc = netCDF4.Dataset(ffp, 'w')
+        try:
+            nc.createDimension('time', None)
+            nc.createVariable('time', 'f8', ('time',), zlib=True)[:] = axis
+        finally:
+            nc.close()
+        chain.append((ffp, axis[0], axis[-1]))
+    return chain
+
+
+def scan(ffp, current_timestep):
+    """
+    Returns next time step from the whole time axis, as before the index guess and the binary search.
+
+    :param str ffp: The file full path
+    :param float current_timestep: The current_timestep
+    :returns: The next timestep
+    :rtype: *float*
+
+    """
+    nc = netCDF4.Dataset(ffp)
+    try:
+        time_axis = nc.variables['time'][:]
+    finally:
+        nc.close()
+    return time_axis[int(np.where(time_axis == current_timestep)[0][0]) + 1]
+
+
+def lookup(chain, length, method):
+    """
+    Looks up the cutting timestep of every partial overlap of the chain.
+
+    :param list chain: The files full paths with their first and last time steps
+    :param int length: The time axis length of each file
+    :param str method: The lookup method ("scan", "bisect" or "guess")
+    :returns: The elapsed time and the cutting timesteps
+    :rtype: *tuple*
+
+    """
+    start = time.time()
+    timesteps = list()
+    for (_, _, last_step), (ffp, first, last) in zip(chain[:-1], chain[1:]):
+        if method == 'scan':
+            timesteps.append(scan(ffp, last_step))
+        elif method == 'bisect':
+            timesteps.append(get_next_timestep(ffp, last_step))
+        else:
+            timesteps.append(get_next_timestep(ffp, last_step, first_step=first, last_step=last, length=length))
+    return time.time() - start, timesteps
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the cutting timestep lookup.')
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--length', type=int, default=87600, help='Time steps per file')
+    parser.add_argument('--overlap', type=int, default=8760, help='Time steps shared by consecutive files')
+    args = parser.parse_args()
+    root = tempfile.mkdtemp()
+    try:
+        chain = make_files(root, args.files, args.length, args.overlap)
+        print '{} deflated files of {} steps, {} partial overlaps of {} steps'.format(args.files, args.length,
+                                                                                     args.files - 1, args.overlap)
+        reference = None
+        for method in ['scan', 'bisect', 'guess']:
+            elapsed, timesteps = lookup(chain, args.length, method)
+            if reference is None:
+                reference = timesteps
+            assert timesteps == reference, 'Cutting timesteps differ with {}'.format(method)
+            print '{:>6s}: {:.3f}s'.format(method, elapsed)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
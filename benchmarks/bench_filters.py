@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Benchmark of the compiled filter collection against the per-regex evaluation.
+
+    Synthetic CMIP6 filenames are repeated across version directories and evaluated against the default
+    filters of the file collector. The compiled engine, with and without the verdicts cache, is compared with
+    the evaluation of each regular expression separately. The verdicts must be the same whatever the engine.
+
+    Usage: python benchmarks/bench_filters.py [--names 20000] [--versions 5] [--repeat 3]
+
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nctime.utils.collector import FilterCollection
+
+
+class PerRegexFilterCollection(FilterCollection):
+    """
+    Filter collection evaluating each regular expression separately with :func:`re.search`.
+
+    """
+
+    def __call__(self, string):
+        return all([bool(re.search(regex, string)) == inclusive for regex, inclusive in self.filters.values()])
+
+
+def make_filters(cls, **kwargs):
+    """
+    Builds a filter collection with the collector default filters and a few additional ones.
+
+    :param type cls: The filter collection class
+    :returns: The filter collection
+    :rtype: *FilterCollection*
+
+    """
+    filters = cls(**kwargs)
+    filters.add(regex='^.*\.nc$', inclusive=True)
+    filters.add(regex='^\..*$', inclusive=False)
+    filters.add(regex='(_fx_|_fixed_|_fx.|_fixed.|_.fx_)', inclusive=False)
+    filters.add(regex=re.compile('^.*_gr_.*$'), inclusive=True)
+    filters.add(regex='(?i)^.*TMP.*$', inclusive=False)
+    return filters
+
+
+def make_names(names):
+    """
+    Builds synthetic CMIP6 filenames, with hidden files, fixed fields and non-NetCDF files.
+
+    :param int names: The number of filenames
+    :returns: The filenames
+    :rtype: *list*
+
+    """
+    rng = random.Random(0)
+    variables = ['tas', 'pr', 'psl', 'ua', 'va', 'orog', 'areacella']
+    filenames = list()
+    for i in range(names):
+        variable = rng.choice(variables)
+        table = 'fx' if variable in ['orog', 'areacella'] else rng.choice(['Amon', 'day', '3hr'])
+        grid = rng.choice(['gr', 'gn'])
+        extension = rng.choice(['.nc', '.nc', '.nc', '.txt'])
+        prefix = '.' if rng.random() < 0.05 else ''
+        year = 1850 + i % 165
+        filenames.append('{}{}_{}_IPSL-CM6A-LR_historical_r{}i1p1f1_{}_{}01-{}12{}'.format(
+            prefix, variable, table, i % 30, grid, year, year, extension))
+    return filenames
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the filter collection.')
+    parser.add_argument('--names', type=int, default=20000)
+    parser.add_argument('--versions', type=int, default=5, help='Times each filename is repeated')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    stream = make_names(args.names) * args.versions
+    engines = [('per-regex', make_filters(PerRegexFilterCollection)),
+               ('compiled', make_filters(FilterCollection)),
+               ('compiled+cache', make_filters(FilterCollection, cache=True))]
+    reference = [engines[0][1](name) for name in stream]
+    for label, filters in engines[1:]:
+        assert [filters(name) for name in stream] == reference, 'Verdicts differ with {}'.format(label)
+    print '{} filenames ({} accepted)'.format(len(stream), sum(reference))
+    for label, filters in engines:
+        def evaluate():
+            # Start from an empty cache on each run
+            if filters.verdicts is not None:
+                filters.verdicts.clear()
+            return [filters(name) for name in stream]
+
+        elapsed = min(timeit.repeat(evaluate, number=1, repeat=args.repeat))
+        print '{:>14s}: {:.3f}s ({:.2f} us/name)'.format(label, elapsed, elapsed * 1e6 / len(stream))
+
+
+if __name__ == '__main__':
+    main()
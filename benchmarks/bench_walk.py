@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Benchmark of the sequential and threaded directory walks of the collector.
+
+    A synthetic deep tree is built into a temporary directory and walked with several numbers of threads.
+    The listing latency of a shared or parallel filesystem can be simulated with "--latency".
+    The collected files must be the same and in the same order whatever the number of threads.
+
+    Usage: python benchmarks/bench_walk.py [--depth 3] [--fanout 10] [--files 5] [--latency 0.01] [--threads 1 4 16]
+
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nctime.utils.collector as collector
+
+
+def make_tree(root, depth, fanout, files):
+    """
+    Builds a synthetic tree with files in the leaf directories.
+
+    :param str root: The tree root
+    :param int depth: The number of directory levels
+    :param int fanout: The number of subdirectories per directory
+    :param int files: The number of files per leaf directory
+    :returns: The number of files
+    :rtype: *int*
+
+    """
+    if not depth:
+        for i in range(files):
+            open(os.path.join(root, 'f{}.nc'.format(i)), 'w').close()
+        return files
+    count = 0
+    for i in range(fanout):
+        path = os.path.join(root, 'd{}'.format(i))
+        os.mkdir(path)
+        count += make_tree(path, depth - 1, fanout, files)
+    return count
+
+
+def walk(root, threads):
+    """
+    Collects the files of the tree.
+
+    :param str root: The tree root
+    :param int threads: The number of walking threads
+    :returns: The elapsed time and the collected files
+    :rtype: *tuple*
+
+    """
+    sources = collector.Collector(sources=[root], threads=threads)
+    sources.FileFilter.add(regex='^.*\.nc$', inclusive=True)
+    sources.FileFilter.add(regex='^\..*$', inclusive=False)
+    sources.PathFilter.add(regex='^.*/\.[\w]*.*$', inclusive=False)
+    start = time.time()
+    # Iterate without list() that would first ask for the collector length
+    files = [ffp for ffp in sources]
+    return time.time() - start, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the directory walks.')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--fanout', type=int, default=8)
+    parser.add_argument('--files', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0., help='Simulated listing latency in seconds')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+    if args.latency:
+        scandir = collector.scandir
+
+        def slow_scandir(path):
+            time.sleep(args.latency)
+            return scandir(path)
+
+        collector.scandir = slow_scandir
+    root = tempfile.mkdtemp()
+    try:
+        count = make_tree(root, args.depth, args.fanout, args.files)
+        print 'Tree: depth {}, fanout {}, {} files, {}s listing latency'.format(args.depth, args.fanout, count,
+                                                                                args.latency)
+        reference = None
+        for threads in args.threads:
+            elapsed, files = walk(root, threads)
+            if reference is None:
+                reference = files
+            assert files == reference, 'Files differ with {} threads'.format(threads)
+            # Files are only in the leaf directories: the walk order is the sorted order
+            assert files == sorted(files), 'Files not sorted with {} threads'.format(threads)
+            print '{:3d} thread(s): {:.3f}s'.format(threads, elapsed)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
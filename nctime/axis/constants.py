@@ -65,8 +65,16 @@ PROCESS_VARS = ['pattern',
                 'limit',
                 'lock',
                 'progress',
-                'nbfiles',
-                'ignore_codes']
+                'nbfound',
+                'ignore_codes',
+                'block_size',
+                'cache_dir',
+                'cache_hits',
+                'cache_misses',
+                'settings']
 
 # Number of decimal to keep in axis truncation
 NDECIMALS = 8
+
+# Approximate memory footprint of one time step when checking a time axis with its boundaries (in bytes)
+BYTES_PER_TIMESTEP = 256
@@ -7,8 +7,11 @@
 
 """
 
+from hashlib import sha1
+
 from ESGConfigParser import SectionParser
 
+from constants import BYTES_PER_TIMESTEP
 from nctime.utils.collector import Collector
 from nctime.utils.constants import *
 from nctime.utils.context import BaseContext
@@ -39,16 +42,32 @@ class ProcessingContext(BaseContext):
             self.on_fly = True if not is_simulation_completed(args.card) else False
         self.limit = args.limit
         self.ignore_codes = args.ignore_errors
+        # Get number of time steps to process at once
+        self.block_size = args.block_size
+        if args.max_memory:
+            self.block_size = max(1, args.max_memory * 1024 ** 2 / BYTES_PER_TIMESTEP)
         self.status = []
+        # Digest of the settings driving the diagnostic to validate cached verdicts
+        self.settings = None
 
     def __enter__(self):
         # Print warning message if on-fly mode
         if self.on_fly:
             Print.warning('"on-fly" mode activated -- Incomplete time axis expected')
         # Init data collector
-        self.sources = Collector(sources=self.input, spinner=False)
+        self.sources = Collector(sources=self.input, spinner=False, counter=self.nbfound,
+                                 threads=self.walk_threads, manifest=self.manifest)
         # Run __enter__() BaseContext
         super(self.__class__, self).__enter__()
+        self.settings = sha1(repr((VERSION,
+                                   getattr(self.pattern, 'pattern', self.pattern),
+                                   self.ref_units,
+                                   self.ref_calendar,
+                                   self.ref_start,
+                                   self.ref_end,
+                                   self.on_fly,
+                                   sorted(self.ignore_codes),
+                                   sorted(FREQ_INC.items())))).hexdigest()
         return self
 
     def __exit__(self, exc_type, exc_val, traceback):
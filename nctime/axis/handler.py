@@ -7,18 +7,17 @@
 
 from copy import deepcopy as copy
 
-import nco
 import numpy as np
-from fuzzywuzzy import fuzz, process
 
 from constants import *
 from custom_exceptions import *
 from nctime.utils.constants import CLIM_SUFFIX, AVERAGE_CORRECTION_FREQ
 from nctime.utils.custom_exceptions import *
 from nctime.utils.custom_print import *
-from nctime.utils.misc import ncopen
+from nctime.utils.misc import ncopen, NetCDFHeader, nc_remove_variables
 from nctime.utils.time import truncated_timestamp, get_start_end_dates_from_filename, dates2str, num2date, date2num, \
-    control_time_units, trunc, time_inc, convert_time_units, str2date
+    control_time_units, trunc, time_inc, convert_time_units, str2date, DateAxis, num2num, \
+    num2str
 
 
 class File(object):
@@ -30,7 +29,8 @@ class File(object):
 
     """
 
-    def __init__(self, ffp, pattern, ref_units, ref_calendar, input_start_timestamp=None, input_end_timestamp=None):
+    def __init__(self, ffp, pattern, ref_units, ref_calendar, input_start_timestamp=None, input_end_timestamp=None,
+                 block_size=None):
         # Retrieve the file full path
         self.ffp = ffp
         # Retrieve the reference time units to use
@@ -49,6 +49,11 @@ class File(object):
         self.time_bounds_rebuilt = None
         self.date_bounds_rebuilt = None
         self.status = list()
+        # Queue of planned fixes to apply within a single write session
+        self.fixes = list()
+        # Read netCDF header and time axis within a single file opening
+        # In blocks mode, the time axis is read later block by block
+        self.header = NetCDFHeader(self.ffp, variable=unicode(self.filename.split('_')[0]), data=not block_size)
         # Get table from file
         try:
             self.table = self.nc_att_get('table_id')
@@ -67,62 +72,56 @@ class File(object):
             self.table = 'None'
         # Get frequency from file
         self.frequency = self.nc_att_get('frequency')
-        # Get netCDF time properties
-        with ncopen(self.ffp) as nc:
-            # Get time length and vector
-            if 'time' not in nc.variables.keys():
-                raise NoNetCDFVariable('time', self.ffp)
-            self.length = nc.variables['time'].shape[0]
-            if self.length == 0:
-                raise EmptyTimeAxis(self.ffp)
-            t = nc.variables['time'][:]
-            self.time_axis = trunc(t, NDECIMALS)
-            self.start_num_infile = self.time_axis[0]
-            self.end_num_infile = self.time_axis[-1]
-            self.date_axis = dates2str(num2date(t, units=self.ref_units, calendar=self.ref_calendar))
-            self.start_date_infile = self.date_axis[0]
-            self.end_date_infile = self.date_axis[-1]
-            self.start_timestamp_infile = truncated_timestamp(str2date(self.start_date_infile), self.timestamp_length)
-            self.end_timestamp_infile = truncated_timestamp(str2date(self.end_date_infile), self.timestamp_length)
-            del t
-            # Get time boundaries
-            self.has_bounds = False
-            self.time_bounds = None
-            self.date_bounds = None
-            self.tbnds = None
-            if 'bounds' in nc.variables['time'].ncattrs():
-                self.has_bounds = True
-                self.tbnds = nc.variables['time'].bounds
-            if 'climatology' in nc.variables['time'].ncattrs():
-                self.has_bounds = True
-                self.tbnds = nc.variables['time'].climatology
-            if self.tbnds:
-                bnds = nc.variables[self.tbnds][:, :]
-                self.time_bounds = trunc(bnds, NDECIMALS)
-                self.date_bounds = np.column_stack((
-                    dates2str(num2date(bnds[:, 0], units=self.ref_units, calendar=self.ref_calendar)),
-                    dates2str(num2date(bnds[:, 1], units=self.ref_units, calendar=self.ref_calendar))
-                ))
-                del bnds
-            # Get time units from file
-            if 'units' not in nc.variables['time'].ncattrs():
-                raise NoNetCDFAttribute('units', self.ffp, 'time')
-            self.tunits = control_time_units(nc.variables['time'].units)
-            # Get calendar from file
-            if 'calendar' not in nc.variables['time'].ncattrs():
-                raise NoNetCDFAttribute('calendar', self.ffp, 'time')
-            self.calendar = nc.variables['time'].calendar
-            # Get boolean on instantaneous time axis
-            variable = unicode(self.filename.split('_')[0])
-            if 'cell_methods' not in nc.variables[variable].ncattrs():
-                raise NoNetCDFAttribute('cell_methods', self.ffp, variable)
-            self.is_instant = False
-            if 'time: point' in nc.variables[variable].cell_methods.lower():
-                self.is_instant = True
-            # Get boolean on climatology time axis
-            self.is_climatology = False
-            if 'climatology' in nc.variables['time'].ncattrs():
-                self.is_climatology = True
+        # Get time length and vector
+        if self.header.time_attrs is None:
+            raise NoNetCDFVariable('time', self.ffp)
+        self.length = self.header.length
+        if self.length == 0:
+            raise EmptyTimeAxis(self.ffp)
+        self.time_axis = None
+        self.date_axis = None
+        t = self.header.time
+        if t is not None:
+            self.time_axis = t
+            # Dates are only decoded on demand for the requested indices
+            self.date_axis = DateAxis(t, units=self.ref_units, calendar=self.ref_calendar)
+        endpoints = np.array([self.header.time_first, self.header.time_last])
+        self.start_num_infile, self.end_num_infile = trunc(endpoints, NDECIMALS)
+        self.start_date_infile, self.end_date_infile = num2str(endpoints, units=self.ref_units,
+                                                               calendar=self.ref_calendar)
+        self.start_timestamp_infile = truncated_timestamp(str2date(self.start_date_infile), self.timestamp_length)
+        self.end_timestamp_infile = truncated_timestamp(str2date(self.end_date_infile), self.timestamp_length)
+        # Get time boundaries
+        self.has_bounds = False
+        self.time_bounds = None
+        self.date_bounds = None
+        self.tbnds = self.header.tbnds
+        if self.tbnds:
+            self.has_bounds = True
+            bnds = self.header.bounds
+            if bnds is not None:
+                self.time_bounds = bnds
+                self.date_bounds = DateAxis(bnds, units=self.ref_units, calendar=self.ref_calendar)
+        # Get time units from file
+        if 'units' not in self.header.time_attrs:
+            raise NoNetCDFAttribute('units', self.ffp, 'time')
+        self.tunits = control_time_units(self.header.time_attrs['units'])
+        # Get calendar from file
+        if 'calendar' not in self.header.time_attrs:
+            raise NoNetCDFAttribute('calendar', self.ffp, 'time')
+        self.calendar = self.header.time_attrs['calendar']
+        # Get boolean on instantaneous time axis
+        if self.header.cell_methods is None:
+            raise NoNetCDFAttribute('cell_methods', self.ffp, self.header.variable)
+        self.is_instant = False
+        if 'time: point' in self.header.cell_methods.lower():
+            self.is_instant = True
+        # Get boolean on climatology time axis
+        self.is_climatology = False
+        if 'climatology' in self.header.time_attrs:
+            self.is_climatology = True
+        # Release raw time values from the header snapshot
+        self.header.time, self.header.bounds = None, None
         # Get time step increment from frequency and table
         self.step, self.step_units = time_inc(self.table, self.frequency)
         # Convert reference time units into frequency units depending on the file (i.e., months/year/hours since ...)
@@ -172,37 +171,51 @@ class File(object):
         self.last_timestamp = None
         self.last_num = None
 
-    def build_time_axis(self):
+    def get_num_axis(self, start=0, stop=None):
+        """
+        Builds the time axis in frequency units between two indices.
+        Values are the same as from ``numpy.arange`` on the whole axis, so that any block of the axis can be
+        rebuilt independently.
+
+        :param int start: The first index of the axis
+        :param int stop: The last index of the axis (excluded), default is the axis length
+        :returns: The time axis in frequency units
+        :rtype: *numpy.array*
+
+        """
+        stop = self.length if stop is None else stop
+        # numpy.arange fills values from the two first ones
+        delta = (self.start_axis + self.step) - self.start_axis
+        return self.start_axis + np.arange(start, stop) * delta
+
+    def build_time_axis(self, start=0, stop=None):
         """
         Rebuilds time axis from date axis, depending on MIP frequency, calendar and instant status.
 
+        :param int start: The first index of the axis to rebuild
+        :param int stop: The last index of the axis to rebuild (excluded), default is the axis length
         :returns: The corresponding theoretical time axis
         :rtype: *numpy.array*
 
         """
-        num_axis = np.arange(start=self.start_axis,
-                             stop=self.start_axis + self.length * self.step,
-                             step=self.step)
-        num_axis = self.check_axis_length(num_axis)
-        date_axis = num2date(num_axis, units=self.funits, calendar=self.ref_calendar)
+        num_axis = self.get_num_axis(start, stop)
+        axis_rebuilt = num2num(num_axis, units=self.funits, new_units=self.ref_units, calendar=self.ref_calendar)
         del num_axis
-        axis_rebuilt = date2num(date_axis, units=self.ref_units, calendar=self.ref_calendar)
-        self.date_axis_rebuilt = dates2str(num2date(axis_rebuilt, units=self.ref_units, calendar=self.ref_calendar))
+        self.date_axis_rebuilt = DateAxis(axis_rebuilt, units=self.ref_units, calendar=self.ref_calendar)
         return axis_rebuilt
 
-    def build_time_bounds(self):
+    def build_time_bounds(self, start=0, stop=None):
         """
         Rebuilds time boundaries from the start date, depending on MIP frequency, calendar and
         instant status.
 
+        :param int start: The first index of the boundaries to rebuild
+        :param int stop: The last index of the boundaries to rebuild (excluded), default is the axis length
         :returns: The corresponding theoretical time boundaries as a [n, 2] array
         :rtype: *numpy.array*
 
         """
-        num_axis = np.arange(start=self.start_axis,
-                             stop=self.start_axis + self.length * self.step,
-                             step=self.step)
-        num_axis = self.check_axis_length(num_axis)
+        num_axis = self.get_num_axis(start, stop)
         num_axis_bnds_inf, num_axis_bnds_sup = num_axis, copy(num_axis)
         if self.is_climatology:
             num_axis_bnds_inf -= self.clim_diff[0] + 0.5
@@ -212,77 +225,52 @@ class File(object):
             num_axis_bnds_sup += 0.5 * self.step
         num_axis_bnds = np.column_stack((num_axis_bnds_inf, num_axis_bnds_sup))
         del num_axis, num_axis_bnds_inf, num_axis_bnds_sup
-        date_axis_bnds = num2date(num_axis_bnds, units=self.funits, calendar=self.ref_calendar)
+        axis_bnds_rebuilt = num2num(num_axis_bnds, units=self.funits, new_units=self.ref_units,
+                                    calendar=self.ref_calendar)
         del num_axis_bnds
-        axis_bnds_rebuilt = date2num(date_axis_bnds, units=self.ref_units, calendar=self.ref_calendar)
-        self.date_bounds_rebuilt = np.column_stack((
-            dates2str(num2date(axis_bnds_rebuilt[:, 0], units=self.ref_units, calendar=self.ref_calendar)),
-            dates2str(num2date(axis_bnds_rebuilt[:, 1], units=self.ref_units, calendar=self.ref_calendar))
-        ))
+        self.date_bounds_rebuilt = DateAxis(axis_bnds_rebuilt, units=self.ref_units, calendar=self.ref_calendar)
         return axis_bnds_rebuilt
 
-    def check_axis_length(self, axis):
+    def get_blocks(self, block_size=None):
         """
-        numpy.arange could suddenly add last endpoint to the array in the case of high number of steps
-        Due to rounding float issue and pre-calculated length in memory.
-        As a workaround, always check length and remove last point if length are different.
+        Yields the time axis and time boundaries by blocks of indices.
+        If no block size, the whole time axis and boundaries from the header snapshot are yielded at once.
+        Otherwise, each block is read from the file within a single file opening, so that memory is bounded
+        by the block size whatever the time axis length.
 
-        :param *numpy.array* axis: The axis to check
-        :returns: The cut axis
-        :rtype: *numpy.array*
+        :param int block_size: The number of time steps per block
+        :returns: The first index, the time axis, the date axis, the time boundaries and the date boundaries \
+        of each block
+        :rtype: *iter*
 
         """
-        if len(axis) == self.length + 1:
-            axis = axis[:-1]
-        assert len(axis) == self.length
-        return axis
+        if not block_size:
+            yield 0, self.time_axis, self.date_axis, self.time_bounds, self.date_bounds
+        else:
+            with ncopen(self.ffp) as nc:
+                for start in xrange(0, self.length, block_size):
+                    stop = min(start + block_size, self.length)
+                    t = nc.variables['time'][start:stop]
+                    bnds, date_bounds = None, None
+                    if self.has_bounds:
+                        bnds = nc.variables[self.tbnds][start:stop, :]
+                        date_bounds = DateAxis(bnds, units=self.ref_units, calendar=self.ref_calendar)
+                    yield start, t, DateAxis(t, units=self.ref_units, calendar=self.ref_calendar), bnds, date_bounds
 
     def nc_var_delete(self, variable):
         """
-        Delete a NetCDF variable using NCO operators.
-        A unique filename is generated to avoid multiprocessing errors.
+        Delete a NetCDF variable.
+        The file is streamed into a copy without the variable, which replaces the original file.
 
         :param str variable: The variable to delete
         :raises Error: If the deletion failed
 
         """
         try:
-            nc = nco.Nco()
-            nc.ncks(input=self.ffp,
-                    options=['-O', '-x', '-v {}'.format(variable)])
+            moved = nc_remove_variables(self.ffp, [variable])
         except:
             raise NetCDFVariableRemoveFail(variable, self.ffp)
-
-    def nc_att_delete(self, variable, attribute):
-        """
-        Delete a NetCDF dimension attribute using NCO operators.
-        A unique filename is generated to avoid multiprocessing errors.
-
-        :param str attribute: The attribute to delete
-        :param str variable: The variable that has the attribute
-        :raises Error: If the deletion failed
-
-        """
-        try:
-            nc = nco.Nco()
-            nc.ncatted(input=self.ffp,
-                       options=['-O', '-a {},{},d,,'.format(attribute, variable)])
-        except:
-            raise NetCDFAttributeRemoveFail(attribute, self.ffp, variable)
-
-    def nc_var_overwrite(self, variable, data):
-        """
-        Rewrite variable to NetCDF file without copy.
-
-        :param str variable: The variable to replace
-        :param float array data: The data array to overwrite
-
-        """
-        with ncopen(self.ffp, 'r+') as nc:
-            if nc.variables[variable].endian() == 'big':
-                nc.variables[variable][:] = data.byteswap(True)
-            else:
-                nc.variables[variable][:] = data
+        Print.debug('{} removed from {} -- {} bytes moved'.format(variable, self.filename, moved))
 
     def nc_att_add(self, attribute, data, variable=None):
         """
@@ -301,26 +289,98 @@ class File(object):
             else:
                 nc.setncattr(attribute, data)
 
-    def nc_att_overwrite(self, attribute, data, variable=None):
+    def queue_att_overwrite(self, attribute, data, variable=None):
         """
-        Rewrite attribute to NetCDF file without copy.
+        Plan an attribute rewrite for the next write session.
 
         :param str attribute: The attribute to replace
         :param str data: The string to add to overwrite
         :param str variable: The variable that has the attribute, default is global attributes
 
         """
-        with ncopen(self.ffp, 'r+') as nc:
-            if variable:
-                if variable not in nc.variables.keys():
-                    raise NoNetCDFVariable(variable, nc.path)
-                nc.variables[variable].setncattr(attribute, data)
-            else:
-                nc.setncattr(attribute, data)
+        self.fixes.append(('att_overwrite', variable, attribute, data))
+
+    def queue_att_delete(self, attribute, variable=None):
+        """
+        Plan an attribute deletion for the next write session.
+
+        :param str attribute: The attribute to delete
+        :param str variable: The variable that has the attribute, default is global attributes
+
+        """
+        self.fixes.append(('att_delete', variable, attribute, None))
+
+    def queue_var_overwrite(self, variable, blocks):
+        """
+        Plan a variable rewrite for the next write session.
+        Blocks are only consumed when the session is applied, so that a generator keeps memory bounded.
+
+        :param str variable: The variable to replace
+        :param iter blocks: An iterable of (start index, data array) to overwrite
+
+        """
+        self.fixes.append(('var_overwrite', variable, None, blocks))
+
+    def queue_var_delete(self, variable):
+        """
+        Plan a variable deletion for the next write session.
+
+        :param str variable: The variable to delete
+
+        """
+        self.fixes.append(('var_delete', variable, None, None))
+
+    def nc_write(self):
+        """
+        Apply all the queued fixes within a single write session.
+        Header changes and data rewrites are done in place within one opening in "r+" mode.
+        Only a variable deletion requires a structural change and falls back to a copy of the file,
+        done first to leave the file untouched if it fails.
+        Writes on a variable to delete are skipped.
+
+        :returns: True if the file has been modified
+        :rtype: *boolean*
+        :raises Error: If an attribute or variable to delete does not exist
+
+        """
+        if not self.fixes:
+            return False
+        deleted = [variable for action, variable, _, _ in self.fixes if action == 'var_delete']
+        inplace = [fix for fix in self.fixes if fix[0] != 'var_delete' and fix[1] not in deleted]
+        for variable in deleted:
+            self.nc_var_delete(variable)
+        if inplace:
+            with ncopen(self.ffp, 'r+') as nc:
+                # Apply header changes first then rewrite data
+                for action, variable, attribute, data in inplace:
+                    if action not in ['att_overwrite', 'att_delete']:
+                        continue
+                    if variable:
+                        if variable not in nc.variables.keys():
+                            raise NoNetCDFVariable(variable, nc.path)
+                        obj = nc.variables[variable]
+                    else:
+                        obj = nc
+                    if action == 'att_overwrite':
+                        obj.setncattr(attribute, data)
+                    else:
+                        if attribute not in obj.ncattrs():
+                            raise NetCDFAttributeRemoveFail(attribute, self.ffp, variable)
+                        obj.delncattr(attribute)
+                for action, variable, _, blocks in inplace:
+                    if action != 'var_overwrite':
+                        continue
+                    big_endian = (nc.variables[variable].endian() == 'big')
+                    for start, data in blocks:
+                        if big_endian:
+                            data = data.byteswap(True)
+                        nc.variables[variable][start:start + len(data)] = data
+        self.fixes = list()
+        return True
 
     def nc_att_get(self, attribute, variable=None):
         """
-        Get attribute from NetCDF file. Default is to find into global attributes.
+        Get attribute from the netCDF header snapshot. Default is to find into global attributes.
         If attribute key is not found, get the closest key name instead.
 
 
@@ -330,23 +390,7 @@ class File(object):
         :rtype: *str*
 
         """
-        with ncopen(self.ffp) as nc:
-            if variable:
-                attrs = nc.variables[variable].__dict__
-            else:
-                attrs = nc.__dict__
-            if attribute in attrs.keys():
-                return attrs[attribute]
-            else:
-                try:
-                    key, score = process.extractOne(attribute, attrs, scorer=fuzz.partial_ratio)
-                    if score >= 80:
-                        Print.warning('Consider "{}" attribute instead of "frequency"'.format(key))
-                        return attrs(key)
-                    else:
-                        raise NoNetCDFAttribute(attribute, self.ffp)
-                except:
-                    raise NoNetCDFAttribute(attribute, self.ffp)
+        return self.header.get_att(attribute, variable)
 
     def nc_file_rename(self, new_filename):
         """
@@ -16,9 +16,10 @@ import numpy as np
 from constants import *
 from context import ProcessingContext
 from handler import File
+from nctime.utils.cache import MetadataCache, header_snapshot
 from nctime.utils.custom_print import *
 from nctime.utils.misc import ProcessContext
-from nctime.utils.time import trunc, truncated_timestamp, str2dates
+from nctime.utils.time import trunc, truncated_timestamp, str2dates, compare_axes
 
 
 def process(ffp):
@@ -35,31 +36,71 @@ def process(ffp):
     pctx = globals()['pctx']
     # Block to avoid program stop if a thread fails
     try:
+        # Reuse the verdict of a previous run on the unchanged file if the settings are the same
+        if pctx.cache and not (pctx.write or pctx.force):
+            record = pctx.cache.get(ffp)
+            if record and record['status'] is not None and record['settings'] == pctx.settings:
+                with pctx.lock:
+                    pctx.cache_hits.value += 1
+                msg = COLORS.HEADER(os.path.basename(ffp))
+                msg += """\n        Cached: {}""".format('Unchanged file since a previous run')
+                msg += status_message(record['status'])
+                with pctx.lock:
+                    if record['status']:
+                        Print.error(msg, buffer=True)
+                    else:
+                        Print.success(msg, buffer=True)
+                return 1 if record['status'] else 0
+            with pctx.lock:
+                pctx.cache_misses.value += 1
         # Instantiate file handler
         fh = File(ffp=ffp,
                   pattern=pctx.pattern,
                   ref_units=pctx.ref_units,
                   ref_calendar=pctx.ref_calendar,
                   input_start_timestamp=pctx.ref_start,
-                  input_end_timestamp=pctx.ref_end)
-        # Check time axis correctness
-        wrong_timesteps = list()
-        # Rebuild a theoretical time axis with appropriate precision
-        fh.time_axis_rebuilt = trunc(fh.build_time_axis(), NDECIMALS)
-        if not np.array_equal(fh.time_axis_rebuilt, fh.time_axis):
+                  input_end_timestamp=pctx.ref_end,
+                  block_size=pctx.block_size)
+        # Check time axis and time boundaries correctness block by block
+        # Axes are compared as exact integer ticks with appropriate precision
+        # Only the wrong time steps to display are kept as (index, date, value, rebuilt date, rebuilt value)
+        time_axis_ko, wrong_timesteps = False, list()
+        time_bounds_ko, wrong_bounds = False, list()
+        for start, time_axis, date_axis, time_bounds, date_bounds in fh.get_blocks(pctx.block_size):
+            stop = start + len(time_axis)
+            # Rebuild a theoretical time axis
+            fh.time_axis_rebuilt = fh.build_time_axis(start, stop)
+            # Skip the comparison if the wrong time steps to display are already found
+            if not (time_axis_ko and pctx.limit and len(wrong_timesteps) >= pctx.limit):
+                limit = pctx.limit - len(wrong_timesteps) if pctx.limit else None
+                match, _, indices = compare_axes(time_axis, fh.time_axis_rebuilt, NDECIMALS, limit=limit)
+                if not match:
+                    time_axis_ko = True
+                    for v in indices:
+                        wrong_timesteps.append((start + v,
+                                                date_axis[v],
+                                                trunc(time_axis[v], NDECIMALS),
+                                                fh.date_axis_rebuilt[v],
+                                                trunc(fh.time_axis_rebuilt[v], NDECIMALS)))
+            if fh.has_bounds:
+                fh.time_bounds_rebuilt = fh.build_time_bounds(start, stop)
+                if not (time_bounds_ko and pctx.limit and len(wrong_bounds) >= pctx.limit):
+                    limit = pctx.limit - len(wrong_bounds) if pctx.limit else None
+                    match, _, indices = compare_axes(time_bounds, fh.time_bounds_rebuilt, NDECIMALS, limit=limit)
+                    if not match:
+                        time_bounds_ko = True
+                        for v in indices:
+                            wrong_bounds.append((start + v,
+                                                 date_bounds[v],
+                                                 trunc(time_bounds[v], NDECIMALS),
+                                                 fh.date_bounds_rebuilt[v],
+                                                 trunc(fh.time_bounds_rebuilt[v], NDECIMALS)))
+        if time_axis_ko:
             fh.status.append(ERROR_TIME_AXIS_KO)
-            time_axis_diff = (fh.time_axis_rebuilt == fh.time_axis)
-            wrong_timesteps = list(np.where(time_axis_diff == False)[0])
-        # Check time boundaries correctness
-        wrong_bounds = list()
-        if fh.has_bounds:
-            fh.time_bounds_rebuilt = trunc(fh.build_time_bounds(), NDECIMALS)
-            if not np.array_equal(fh.time_bounds_rebuilt, fh.time_bounds):
-                fh.status.append(ERROR_TIME_BOUNDS_KO)
-                time_bounds_diff = (fh.time_bounds_rebuilt == fh.time_bounds)
-                wrong_bounds = list(np.where(np.all(time_bounds_diff, axis=1) == False)[0])
+        if time_bounds_ko:
+            fh.status.append(ERROR_TIME_BOUNDS_KO)
         # Get last theoretical date
-        fh.last_num = fh.time_axis_rebuilt[-1]
+        fh.last_num = trunc(fh.time_axis_rebuilt[-1], NDECIMALS)
         fh.last_date = fh.date_axis_rebuilt[-1]
         fh.last_timestamp = truncated_timestamp(str2dates(fh.last_date), fh.timestamp_length)
         # Check consistency between start date infile and start date from filename
@@ -119,25 +160,38 @@ def process(ffp):
             # Change filename and file full path dynamically
             fh.nc_file_rename(new_filename=re.sub(fh.orig_end_timestamp_filename, fh.last_timestamp, fh.filename))
             correction = True
+        # All the fixes below are queued and applied within a single write session
         # Remove time boundaries depending on checking
         if pctx.write and ERROR_TIME_BOUNDS_INS in fh.status:
             # Delete time bounds and bounds attribute from file if write or force mode
-            fh.nc_var_delete(variable=fh.tbnds)
-            fh.nc_att_delete(attribute='bounds', variable='time')
+            fh.queue_att_delete(attribute='bounds', variable='time')
+            fh.queue_var_delete(variable=fh.tbnds)
             correction = True
         # Rewrite time units depending on checking
         if pctx.write and ERROR_TIME_UNITS in fh.status:
-            fh.nc_att_overwrite('units', variable='time', data=pctx.ref_units)
+            fh.queue_att_overwrite('units', variable='time', data=pctx.ref_units)
         # Rewrite time calendar depending on checking
         if pctx.write and ERROR_TIME_CALENDAR in fh.status:
-            fh.nc_att_overwrite('calendar', variable='time', data=pctx.ref_calendar)
+            fh.queue_att_overwrite('calendar', variable='time', data=pctx.ref_calendar)
         # Rewrite time axis depending on checking
         if (pctx.write and {ERROR_TIME_AXIS_KO, ERROR_TIME_BOUNDS_KO}.intersection(set(fh.status))) or pctx.force:
-            fh.nc_var_overwrite('time', fh.time_axis_rebuilt)
-            # Rewrite time boundaries if needed
-            if fh.has_bounds:
-                fh.nc_var_overwrite(fh.tbnds, fh.time_bounds_rebuilt)
+            if pctx.block_size:
+                # Rebuild and rewrite time axis and boundaries block by block
+                starts = xrange(0, fh.length, pctx.block_size)
+                fh.queue_var_overwrite('time', (
+                    (start, trunc(fh.build_time_axis(start, min(start + pctx.block_size, fh.length)), NDECIMALS))
+                    for start in starts))
+                if fh.has_bounds:
+                    fh.queue_var_overwrite(fh.tbnds, (
+                        (start, trunc(fh.build_time_bounds(start, min(start + pctx.block_size, fh.length)), NDECIMALS))
+                        for start in starts))
+            else:
+                fh.queue_var_overwrite('time', [(0, trunc(fh.time_axis_rebuilt, NDECIMALS))])
+                # Rewrite time boundaries if needed
+                if fh.has_bounds:
+                    fh.queue_var_overwrite(fh.tbnds, [(0, trunc(fh.time_bounds_rebuilt, NDECIMALS))])
             correction = True
+        written = fh.nc_write()
         # Diagnostic display
         msgval = {}
         msgval['file'] = COLORS.HEADER(fh.filename)
@@ -217,32 +271,28 @@ def process(ffp):
         Has bounds: {bnds}""".format(**msgval)
 
         # Add status message
-        if fh.status:
-            for s in fh.status:
-                msg += """\n        Status: {} """.format(COLORS.FAIL('Error {} -- {}'.format(s, STATUS[s])))
-                if correction and s in ERROR_CORRECTED_SET:
-                    msg += ' -- {}'.format(COLORS.SUCCESS('Corrected'))
-        else:
-            msg += """\n        Status: {}""".format(COLORS.SUCCESS(STATUS[ERROR_TIME_AXIS_OK]))
+        msg += status_message(fh.status, correction)
         # Display wrong time steps and/or bounds
-        timestep_limit = pctx.limit if pctx.limit else len(wrong_timesteps)
-        for i, v in enumerate(wrong_timesteps):
-            if (i + 1) <= timestep_limit:
-                msg += """\n        Wrong time step at index {}: IN FILE -- {} = {} vs. REBUILT -- {} = {}""".format(
-                    COLORS.HEADER(str(v + 1)),
-                    COLORS.FAIL(fh.date_axis[v]),
-                    COLORS.FAIL(str(fh.time_axis[v]).ljust(10)),
-                    COLORS.SUCCESS(fh.date_axis_rebuilt[v]),
-                    COLORS.SUCCESS(str(fh.time_axis_rebuilt[v]).ljust(10)))
-        bounds_limit = pctx.limit if pctx.limit else len(wrong_bounds)
-        for i, v in enumerate(wrong_bounds):
-            if (i + 1) <= bounds_limit:
-                msg += """\n        Wrong time bounds at index {}: IN FILE -- {} = {} vs. REBUILT -- {} = {}""".format(
-                    COLORS.HEADER(str(v + 1)),
-                    COLORS.FAIL('[{} {}]'.format(fh.date_bounds[v][0], fh.date_bounds[v][1])),
-                    COLORS.FAIL(str(fh.time_bounds[v]).ljust(20)),
-                    COLORS.SUCCESS('[{} {}]'.format(fh.date_bounds_rebuilt[v][0], fh.date_bounds_rebuilt[v][1])),
-                    COLORS.SUCCESS(str(fh.time_bounds_rebuilt[v]).ljust(20)))
+        for v, date, num, date_rebuilt, num_rebuilt in wrong_timesteps:
+            msg += """\n        Wrong time step at index {}: IN FILE -- {} = {} vs. REBUILT -- {} = {}""".format(
+                COLORS.HEADER(str(v + 1)),
+                COLORS.FAIL(date),
+                COLORS.FAIL(str(num).ljust(10)),
+                COLORS.SUCCESS(date_rebuilt),
+                COLORS.SUCCESS(str(num_rebuilt).ljust(10)))
+        for v, dates, nums, dates_rebuilt, nums_rebuilt in wrong_bounds:
+            msg += """\n        Wrong time bounds at index {}: IN FILE -- {} = {} vs. REBUILT -- {} = {}""".format(
+                COLORS.HEADER(str(v + 1)),
+                COLORS.FAIL('[{} {}]'.format(dates[0], dates[1])),
+                COLORS.FAIL(str(nums).ljust(20)),
+                COLORS.SUCCESS('[{} {}]'.format(dates_rebuilt[0], dates_rebuilt[1])),
+                COLORS.SUCCESS(str(nums_rebuilt).ljust(20)))
+        # Record header snapshot and verdict of the unchanged file
+        if pctx.cache and not correction and not written:
+            pctx.cache.put(ffp,
+                           header=header_snapshot(fh.header, fh.table, fh.frequency),
+                           settings=pctx.settings,
+                           status=fh.status)
         # Acquire lock to print result
         with pctx.lock:
             if fh.status:
@@ -270,12 +320,33 @@ def process(ffp):
         # Print progress
         with pctx.lock:
             pctx.progress.value += 1
-            percentage = int(pctx.progress.value * 100 / pctx.nbfiles)
+            percentage = int(pctx.progress.value * 100 / pctx.nbfound.value)
             msg = COLORS.OKBLUE('\rProcess netCDF file(s): ')
-            msg += '{}% | {}/{} files'.format(percentage, pctx.progress.value, pctx.nbfiles)
+            msg += '{}% | {}/{} files'.format(percentage, pctx.progress.value, pctx.nbfound.value)
             Print.progress(msg)
 
 
+def status_message(status, correction=False):
+    """
+    Builds the status lines of the diagnostic message.
+
+    :param list status: The status codes
+    :param boolean correction: True if the errors have been corrected
+    :returns: The status message
+    :rtype: *str*
+
+    """
+    msg = ''
+    if status:
+        for s in status:
+            msg += """\n        Status: {} """.format(COLORS.FAIL('Error {} -- {}'.format(s, STATUS[s])))
+            if correction and s in ERROR_CORRECTED_SET:
+                msg += ' -- {}'.format(COLORS.SUCCESS('Corrected'))
+    else:
+        msg += """\n        Status: {}""".format(COLORS.SUCCESS(STATUS[ERROR_TIME_AXIS_OK]))
+    return msg
+
+
 def initializer(keys, values):
     """
     Initialize process context by setting particular variables as global variables.
@@ -287,6 +358,8 @@ def initializer(keys, values):
     assert len(keys) == len(values)
     global pctx
     pctx = ProcessContext({key: values[i] for i, key in enumerate(keys)})
+    # Open the metadata cache within each process
+    pctx.cache = MetadataCache(pctx.cache_dir) if pctx.cache_dir else None
 
 
 def run(args=None):
@@ -305,7 +378,6 @@ def run(args=None):
     with ProcessingContext(args) as ctx:
         # Collecting data
         Print.progress('\rAnalysing data, please wait...')
-        ctx.nbfiles = len(ctx.sources)
         # Init process context
         cctx = {name: getattr(ctx, name) for name in PROCESS_VARS}
         if ctx.use_pool:
@@ -326,6 +398,8 @@ def run(args=None):
         Print.progress('\n')
         # Flush buffer
         Print.flush()
+        # Get number of files (already collected while processing)
+        ctx.nbfiles = len(ctx.sources)
         # Get number of errors
         ctx.nbskip = ctx.nbfiles - len(handlers)
         ctx.nberrors = sum(handlers)
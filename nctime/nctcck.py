@@ -10,6 +10,7 @@
 
 """
 
+from nctime.overlap.executor import run as execute
 from nctime.overlap.main import run
 
 from utils.constants import *
@@ -70,8 +71,14 @@ def get_args(args=None):
     main.add_argument(
         'directory',
         action=DirectoryChecker,
-        nargs='+',
+        nargs='*',
         help=DIRECTORY_HELP)
+    main.add_argument(
+        '--from-file',
+        metavar='MANIFEST',
+        type=manifest_validator,
+        default=None,
+        help=FROM_FILE_HELP)
     main.add_argument(
         '--ignore-dir',
         metavar="PYTHON_REGEX",
@@ -100,6 +107,18 @@ def get_args(args=None):
         action='store_true',
         default=False,
         help=FULL_ONLY_HELP)
+    main.add_argument(
+        '--plan',
+        metavar='PLAN_FILE',
+        type=str,
+        default=None,
+        help=PLAN_HELP)
+    main.add_argument(
+        '--apply-plan',
+        metavar='PLAN_FILE',
+        type=str,
+        default=None,
+        help=APPLY_PLAN_HELP)
     group = main.add_mutually_exclusive_group(required=False)
     group.add_argument(
         '-x', '--xml',
@@ -143,12 +162,36 @@ def get_args(args=None):
         action='store_true',
         default=False,
         help=ALL_HELP)
+    main.add_argument(
+        '--header-free',
+        action='store_true',
+        default=False,
+        help=HEADER_FREE_HELP)
+    main.add_argument(
+        '--graph-backend',
+        metavar='numpy',
+        choices=['numpy', 'networkx'],
+        type=str,
+        default='numpy',
+        help=GRAPH_BACKEND_HELP)
+    main.add_argument(
+        '--cache-dir',
+        metavar='PATH',
+        type=str,
+        default=None,
+        help=CACHE_DIR_HELP)
     main.add_argument(
         '--max-processes',
         metavar='INT',
         type=processes_validator,
         default=4,
         help=MAX_PROCESSES_HELP)
+    main.add_argument(
+        '--walk-threads',
+        metavar='INT',
+        type=threads_validator,
+        default=1,
+        help=WALK_THREADS_HELP)
     group = main.add_mutually_exclusive_group(required=False)
     group.add_argument(
         '--color',
@@ -158,7 +201,10 @@ def get_args(args=None):
         '--no-color',
         action='store_true',
         help=NO_COLOR_HELP)
-    return main.prog, main.parse_args(args)
+    args = main.parse_args(args)
+    if not args.directory and not args.from_file and not args.apply_plan:
+        main.error('too few arguments')
+    return main.prog, args
 
 
 def main(args=None):
@@ -166,7 +212,10 @@ def main(args=None):
     prog, args = get_args(args)
     setattr(args, 'prog', prog)
     # Run program
-    run(args)
+    if args.apply_plan:
+        execute(args)
+    else:
+        run(args)
 
 
 if __name__ == "__main__":
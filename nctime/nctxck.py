@@ -70,8 +70,14 @@ def get_args(args=None):
     main.add_argument(
         'input',
         action=InputChecker,
-        nargs='+',
+        nargs='*',
         help=INPUT_HELP)
+    main.add_argument(
+        '--from-file',
+        metavar='MANIFEST',
+        type=manifest_validator,
+        default=None,
+        help=FROM_FILE_HELP)
     main.add_argument(
         '--ignore-dir',
         metavar="PYTHON_REGEX",
@@ -150,18 +156,43 @@ def get_args(args=None):
         default=5,
         nargs='?',
         help=LIMIT_HELP)
+    group = main.add_mutually_exclusive_group(required=False)
+    group.add_argument(
+        '--block-size',
+        metavar='INT',
+        type=positive_only,
+        default=None,
+        help=BLOCK_SIZE_HELP)
+    group.add_argument(
+        '--max-memory',
+        metavar='MB',
+        type=positive_only,
+        default=None,
+        help=MAX_MEMORY_HELP)
     main.add_argument(
         '--ignore-errors',
         action=CodeChecker,
         metavar='CODE',
         default='',
         help=IGNORE_ERROR_HELP)
+    main.add_argument(
+        '--cache-dir',
+        metavar='PATH',
+        type=str,
+        default=None,
+        help=CACHE_DIR_HELP)
     main.add_argument(
         '--max-processes',
         metavar='INT',
         type=processes_validator,
         default=4,
         help=MAX_PROCESSES_HELP)
+    main.add_argument(
+        '--walk-threads',
+        metavar='INT',
+        type=threads_validator,
+        default=1,
+        help=WALK_THREADS_HELP)
     group = main.add_mutually_exclusive_group(required=False)
     group.add_argument(
         '--color',
@@ -171,7 +202,10 @@ def get_args(args=None):
         '--no-color',
         action='store_true',
         help=NO_COLOR_HELP)
-    return main.prog, main.parse_args(args)
+    args = main.parse_args(args)
+    if not args.input and not args.from_file:
+        main.error('too few arguments')
+    return main.prog, args
 
 
 def main(args=None):
@@ -11,8 +11,15 @@
 PROCESS_VARS = ['pattern',
                 'ref_calendar',
                 'progress',
-                'nbfiles',
-                'lock']
+                'nbfound',
+                'lock',
+                'cache_dir',
+                'cache_hits',
+                'cache_misses']
+
+# Filename facets giving the MIP table and the frequency
+TABLE_FACETS = ['table_id', 'cmor_table', 'table']
+FREQUENCY_FACETS = ['frequency', 'time_frequency']
 
 # CMIP6 filename format
 CMIP6_FILENAME_PATTERN = '^(?P<variable_id>[\w.-]+)_' \
@@ -26,3 +33,6 @@ CMIP6_FILENAME_PATTERN = '^(?P<variable_id>[\w.-]+)_' \
 
 # Facet to ignore
 IGNORED_FACETS = ['period_start', 'period_end']
+
+# Version of the resolution plan format
+PLAN_VERSION = 1
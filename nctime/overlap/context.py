@@ -7,6 +7,10 @@
 
 """
 
+from hashlib import sha1
+from multiprocessing import cpu_count
+from multiprocessing.managers import SyncManager
+
 from ESGConfigParser import SectionParser
 
 from nctime.utils.collector import Collector
@@ -34,6 +38,12 @@ class ProcessingContext(BaseContext):
         self.period_start = int(untruncated_timestamp(args.start)) if args.start else None
         self.period_end = int(untruncated_timestamp(args.end)) if args.end else None
         self.full_only = args.full_only
+        self.plan = args.plan
+        self.deleted = 0
+        self.truncated = 0
+        self.written = 0
+        self.graph_backend = args.graph_backend
+        self.header_free = args.header_free
         self.overlaps = 0
         self.broken = 0
         # Get xml path(s)
@@ -45,12 +55,28 @@ class ProcessingContext(BaseContext):
             self.xml = None
         self.nbnodes = 0
         self.nbdsets = 0
+        # Numbers of nodes, stored edges and bytes of the largest graph built
+        self.largest_graph = None
+        # Number of unchanged datasets skipped thanks to the dataset index
+        self.nbreused = 0
+        # Digest of the settings driving the evaluation to validate indexed verdicts
+        self.settings = None
 
     def __enter__(self):
         # Init data collector
-        self.sources = Collector(sources=self.directory)
+        self.sources = Collector(sources=self.directory, counter=self.nbfound, threads=self.walk_threads,
+                                 manifest=self.manifest)
         # Run __enter__() BaseContext
         super(self.__class__, self).__enter__()
+        self.settings = sha1(repr((VERSION,
+                                   getattr(self.pattern, 'pattern', self.pattern),
+                                   self.ref_calendar,
+                                   self.period_start,
+                                   self.period_end,
+                                   self.header_free,
+                                   self.graph_backend,
+                                   self.resolve or bool(self.plan),
+                                   sorted(FREQ_INC.items())))).hexdigest()
         return self
 
     def __exit__(self, exc_type, exc_val, traceback):
@@ -66,11 +92,90 @@ class ProcessingContext(BaseContext):
             msg += COLORS.FAIL(m)
         else:
             msg += COLORS.SUCCESS(m)
+        m = '\nNumber of dataset(s) with error(s): {}'.format(self.nberrors)
+        if self.nberrors:
+            msg += COLORS.FAIL(m)
+        else:
+            msg += COLORS.SUCCESS(m)
+        if self.largest_graph:
+            msg += COLORS.OKBLUE('\nLargest graph: {} node(s), {} stored edge(s), {} byte(s)'.format(
+                *self.largest_graph))
+        if self.cache_dir:
+            percentage = int(self.nbreused * 100 / self.nbdsets) if self.nbdsets else 0
+            msg += COLORS.OKBLUE('\nNumber of unchanged dataset(s) skipped: {}/{} ({}%)'.format(self.nbreused,
+                                                                                              self.nbdsets,
+                                                                                              percentage))
+        if self.resolve:
+            msg += resolution_summary(self)
         Print.summary(msg)
         # Run __exit__() BaseContext
         super(self.__class__, self).__exit__(exc_type, exc_val, traceback)
 
 
+class ExecutionContext(object):
+    """
+    Encapsulates the processing context/information to apply a resolution plan.
+
+    :param ArgumentParser args: Parsed command-line arguments
+    :returns: The processing context
+    :rtype: *ExecutionContext*
+
+    """
+
+    def __init__(self, args):
+        # Init print management
+        Print.init(log=args.log, debug=args.debug, all=args.all, cmd=args.prog)
+        # Print command-line
+        Print.command()
+        if args.color:
+            enable_colors()
+        if args.no_color:
+            disable_colors()
+        self.plan = args.apply_plan
+        self.processes = args.max_processes if args.max_processes <= cpu_count() else cpu_count()
+        self.use_pool = (self.processes != 1)
+        # Init process manager
+        if self.use_pool:
+            manager = SyncManager()
+            manager.start()
+            Print.BUFFER = manager.Value(c_char_p, '')
+        self.nbdsets = 0
+        self.nberrors = 0
+        self.deleted = 0
+        self.truncated = 0
+        self.written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, traceback):
+        msg = COLORS.HEADER('Number of dataset(s): {}'.format(self.nbdsets))
+        msg += resolution_summary(self)
+        m = '\nNumber of dataset(s) with error(s): {}'.format(self.nberrors)
+        if self.nberrors:
+            msg += COLORS.FAIL(m)
+        else:
+            msg += COLORS.SUCCESS(m)
+        Print.summary(msg)
+        # Print log path if exists
+        Print.log()
+
+
+def resolution_summary(ctx):
+    """
+    Formats the summary of the overlap resolution.
+
+    :param ProcessingContext ctx: The processing context (or the equivalent *ExecutionContext*)
+    :returns: The summary lines
+    :rtype: *str*
+
+    """
+    msg = COLORS.OKBLUE('\nNumber of file(s) deleted: {}'.format(ctx.deleted))
+    msg += COLORS.OKBLUE('\nNumber of file(s) truncated: {}'.format(ctx.truncated))
+    msg += COLORS.OKBLUE('\nNumber of byte(s) written: {}'.format(ctx.written))
+    return msg
+
+
 def yield_xml_from_card(card_path):
     """
     Yields XML path from run.card and config.card attributes.
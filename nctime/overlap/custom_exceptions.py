@@ -6,3 +6,18 @@
     :synopsis: Custom exceptions used in this module.
 
 """
+
+
+#############################
+# Exceptions for file graph #
+#############################
+
+class NoPathFound(Exception):
+    """
+    Raised when no path exists between the "START" and "END" nodes of a graph.
+
+    """
+
+    def __init__(self):
+        self.msg = "No path found between START and END nodes."
+        super(self.__class__, self).__init__(self.msg)
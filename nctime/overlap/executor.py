@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+   :platform: Unix
+   :synopsis: Plan and apply the resolution of overlapping files.
+
+"""
+
+import itertools
+import json
+import traceback
+from multiprocessing import Pool
+
+import nco
+
+from constants import PLAN_VERSION
+from context import ExecutionContext
+from nctime.utils.custom_print import *
+
+
+def get_truncated_path(ffp, pattern, from_date, to_date):
+    """
+    Gets the full path of the file truncated to resolve a partial overlap.
+    The period dates of the filename are replaced by the new ones.
+
+    :param str ffp: The file full path
+    :param str pattern: The filename pattern
+    :param int from_date: Overlap starting date
+    :param int to_date:  Overlap ending date
+    :returns: The truncated file full path
+    :rtype: *str*
+
+    """
+    directory, filename = os.path.split(ffp)
+    filename_attr = re.match(pattern, filename).groupdict()
+    assert len(filename_attr['period_start']) == len(filename_attr['period_end'])
+    from_timestamp = str(from_date)[:len(filename_attr['period_start'])]
+    to_timestamp = str(to_date)[:len(filename_attr['period_end'])]
+    tmp = filename.replace(filename_attr['period_start'], from_timestamp)
+    return os.path.join(directory, tmp.replace(filename_attr['period_end'], to_timestamp))
+
+
+def get_plan_entry(gid, partial_overlaps, full_overlaps, pattern, full_only=False):
+    """
+    Gets the resolution plan of a dataset.
+    Full overlapping files are deleted, partial overlapping files are truncated from the cutting timestep.
+
+    :param str gid: The dataset id
+    :param dict partial_overlaps: Dictionary of partial overlaps
+    :param dict full_overlaps: Dictionary of full overlaps
+    :param str pattern: The filename pattern
+    :param boolean full_only: Only plans the deletion of full overlapping files if True
+    :returns: The dataset resolution plan, None if nothing to resolve
+    :rtype: *dict*
+
+    """
+    # No overlaps are evaluated for a broken time series
+    if partial_overlaps is None or full_overlaps is None:
+        return None
+    entry = {'dataset': gid,
+             'delete': [full_overlaps[node]['path'] for node in sorted(full_overlaps)],
+             'truncate': list()}
+    if not full_only:
+        for node in sorted(partial_overlaps):
+            overlap = partial_overlaps[node]
+            entry['truncate'].append({'path': overlap['path'],
+                                      'new_path': get_truncated_path(ffp=overlap['path'],
+                                                                     pattern=pattern,
+                                                                     from_date=overlap['cutting_date'],
+                                                                     to_date=overlap['end']),
+                                      'cutting_timestep': float(overlap['cutting_timestep'])})
+    if entry['delete'] or entry['truncate']:
+        return entry
+    return None
+
+
+def write_plan(path, entries):
+    """
+    Writes the resolution plan as JSON.
+
+    :param str path: The plan file path
+    :param list entries: The dataset resolution plans
+
+    """
+    with open(path, 'w') as f:
+        json.dump({'version': PLAN_VERSION, 'datasets': entries}, f, indent=2, sort_keys=True)
+
+
+def read_plan(path):
+    """
+    Reads a resolution plan.
+
+    :param str path: The plan file path
+    :returns: The dataset resolution plans
+    :rtype: *list*
+
+    """
+    with open(path) as f:
+        plan = json.load(f)
+    assert plan['version'] == PLAN_VERSION
+    return plan['datasets']
+
+
+def resolve_dataset(entry):
+    """
+    Applies the resolution plan of a dataset.
+    Full overlapping files have to be deleted before partial overlapping files are truncated.
+    The truncated file is written before the original one is removed.
+
+    :param dict entry: The dataset resolution plan
+    :returns: The number of deleted files, truncated files, bytes written and errors
+    :rtype: *tuple*
+
+    """
+    deleted, truncated, written = 0, 0, 0
+    # Block to avoid program stop if a process fails
+    try:
+        for ffp in entry['delete']:
+            os.remove(ffp)
+            deleted += 1
+        for item in entry['truncate']:
+            assert not os.path.exists(item['new_path'])
+            nc = nco.Nco()
+            nc.ncks(input=item['path'],
+                    output=item['new_path'],
+                    options=['-O', '-d time,{!r},,1'.format(item['cutting_timestep'])])
+            written += os.path.getsize(item['new_path'])
+            os.remove(item['path'])
+            truncated += 1
+        return deleted, truncated, written, 0
+    except KeyboardInterrupt:
+        raise
+    except Exception:
+        exc = traceback.format_exc().splitlines()
+        msg = TAGS.ERROR
+        msg += COLORS.HEADER(entry['dataset'])
+        msg += '\n'.join(exc)
+        Print.exception(msg, buffer=True)
+        return deleted, truncated, written, 1
+
+
+def execute_plan(ctx, entries):
+    """
+    Applies the resolution plans of the datasets with bounded parallelism.
+    The results are accumulated into the processing context.
+
+    :param ProcessingContext ctx: The processing context (or the equivalent *ExecutionContext*)
+    :param list entries: The dataset resolution plans
+
+    """
+    if ctx.use_pool:
+        pool = Pool(processes=ctx.processes)
+        processes = pool.imap_unordered(resolve_dataset, entries)
+    else:
+        processes = itertools.imap(resolve_dataset, entries)
+    for deleted, truncated, written, errors in processes:
+        ctx.deleted += deleted
+        ctx.truncated += truncated
+        ctx.written += written
+        ctx.nberrors += errors
+    # Close pool of workers if exists
+    if ctx.use_pool:
+        pool.close()
+        pool.join()
+
+
+def run(args=None):
+    """
+    Main process that applies a resolution plan previously written by nctcck.
+
+    :param ArgumentParser args: Command-line arguments parser
+
+    """
+    # Instantiate processing context
+    with ExecutionContext(args) as ctx:
+        entries = read_plan(ctx.plan)
+        ctx.nbdsets = len(entries)
+        execute_plan(ctx, entries)
+        Print.flush()
+    # Evaluate errors and exit with appropriate return code
+    if ctx.nberrors:
+        sys.exit(ctx.nberrors)
@@ -5,15 +5,19 @@
 
 """
 
-from copy import deepcopy as copy
+import json
+import sys
+from hashlib import sha1
 
-from fuzzywuzzy import fuzz, process
-from networkx import DiGraph
+import numpy as np
 
+from constants import TABLE_FACETS, FREQUENCY_FACETS
+from custom_exceptions import NoPathFound
+from nctime.utils.cache import MetadataCache, header_snapshot
 from nctime.utils.constants import CLIM_SUFFIX
 from nctime.utils.custom_exceptions import *
 from nctime.utils.custom_print import *
-from nctime.utils.misc import ncopen
+from nctime.utils.misc import NetCDFHeader
 from nctime.utils.time import get_start_end_dates_from_filename, dates2int
 
 
@@ -35,22 +39,28 @@ class Filename(object):
         else:
             self.id = '_'.join(self.filename.split('_')[:-1])
         # Get first and last time steps
+        self.first_step = None
+        self.last_step = None
+        self.length = None
         # Start/end period dates from filename + next expected date
         self.start_date = None
         self.end_date = None
         self.next_date = None
+        # NetCDF header snapshot
+        self.header = None
+        # Header snapshot to cache
+        self.snapshot = None
 
-    def get_start_end_dates(self, pattern, calendar):
+    def get_table_frequency(self):
         """
-        Wraps and records :func:`get_start_end_dates_from_filename` results.
+        Gets the MIP table and the frequency from the netCDF header, read within a single file opening.
+        The header snapshot to cache is recorded.
 
-        :param re Object pattern: The filename pattern as a regex (from `re library \
-        <https://docs.python.org/2/library/re.html>`_).
-        :param str calendar: The NetCDF calendar attribute
-        :returns: Start and end dates as number of days since the referenced date
-        :rtype: *float*
+        :returns: The MIP table and the frequency
+        :rtype: *tuple*
 
         """
+        self.header = NetCDFHeader(self.ffp, data=False)
         # Get table from file
         try:
             table = self.nc_att_get('table_id')
@@ -67,6 +77,90 @@ class Filename(object):
             table = 'None'
         # Get frequency from file
         frequency = self.nc_att_get('frequency')
+        self.snapshot = header_snapshot(self.header, table, frequency)
+        # Release header snapshot before sending the handler back to the main process
+        self.header = None
+        return table, frequency
+
+    def get_table_frequency_from_filename(self, pattern):
+        """
+        Gets the MIP table and the frequency from the filename facets without opening the file.
+        A missing frequency is deduced from the table if all its frequencies have the same time increment.
+
+        :param re Object pattern: The filename pattern as a regex (from `re library \
+        <https://docs.python.org/2/library/re.html>`_).
+        :returns: The MIP table and the frequency, None if they cannot be deduced from the filename
+        :rtype: *tuple*
+
+        """
+        facets = re.match(pattern, self.name).groupdict()
+        table = [facets[key] for key in TABLE_FACETS if facets.get(key)]
+        table = table[0] if table else 'None'
+        frequency = [facets[key] for key in FREQUENCY_FACETS if facets.get(key)]
+        if frequency:
+            frequency = frequency[0]
+            if (table, frequency) in FREQ_INC:
+                return table, frequency
+            if ('None', frequency) in FREQ_INC:
+                return 'None', frequency
+        elif table != 'None':
+            frequencies = sorted([f for t, f in FREQ_INC.keys() if t == table])
+            if frequencies and len(set([tuple(FREQ_INC[table, f]) for f in frequencies])) == 1:
+                return table, frequencies[0]
+        return None
+
+    def set_time_steps(self, snapshot):
+        """
+        Records the time axis length and endpoints from a header snapshot.
+
+        :param dict snapshot: The header snapshot (from :func:`header_snapshot`)
+
+        """
+        self.first_step = snapshot['first']
+        self.last_step = snapshot['last']
+        self.length = snapshot['length']
+
+    def get_interval(self):
+        """
+        Gets the file interval to record into the dataset index.
+
+        :returns: The file interval
+        :rtype: *dict*
+
+        """
+        return {'path': self.ffp,
+                'start': self.start_date,
+                'end': self.end_date,
+                'next': self.next_date,
+                'first_step': self.first_step,
+                'last_step': self.last_step,
+                'length': self.length}
+
+    def set_interval(self, interval):
+        """
+        Restores the dates and time steps of an unchanged file from the dataset index.
+
+        :param dict interval: The file interval (from :meth:`get_interval`)
+
+        """
+        self.start_date = interval['start']
+        self.end_date = interval['end']
+        self.next_date = interval['next']
+        self.set_time_steps({'first': interval['first_step'],
+                             'last': interval['last_step'],
+                             'length': interval['length']})
+
+    def get_start_end_dates(self, pattern, calendar, table, frequency):
+        """
+        Wraps and records :func:`get_start_end_dates_from_filename` results.
+
+        :param re Object pattern: The filename pattern as a regex (from `re library \
+        <https://docs.python.org/2/library/re.html>`_).
+        :param str calendar: The NetCDF calendar attribute
+        :param str table: The MIP table
+        :param str frequency: The frequency
+
+        """
         dates = get_start_end_dates_from_filename(filename=self.name,
                                                   pattern=pattern,
                                                   table=table,
@@ -76,7 +170,7 @@ class Filename(object):
 
     def nc_att_get(self, attribute, variable=None):
         """
-        Get attribute from NetCDF file. Default is to find into global attributes.
+        Get attribute from the netCDF header snapshot. Default is to find into global attributes.
         If attribute key is not found, get the closest key name instead.
 
 
@@ -86,54 +180,492 @@ class Filename(object):
         :rtype: *str*
 
         """
-        with ncopen(self.ffp) as nc:
-            if variable:
-                attrs = nc.variables[variable].__dict__
-            else:
-                attrs = nc.__dict__
-            if attribute in attrs.keys():
-                return attrs[attribute]
+        return self.header.get_att(attribute, variable)
+
+
+class IntervalGraph(object):
+    """
+    Directed graph of files specialized for time intervals, as an alternative to `networkx.DiGraph()`.
+    It supports the subset of the DiGraph API used to evaluate a dataset.
+    Edges between files are implicit: a file has an edge to every other file starting before or at its next date.
+    Only the edges from the "START" node and to the "END" node are stored.
+
+    The nodes and the adjacency of each node are iterated as the dictionaries of a `networkx.DiGraph()` filled by
+    :func:`create_edges` so that both backends choose the same shortest path.
+
+    """
+
+    def __init__(self):
+        self.node = dict()
+        self.inserted = list()
+        self.succ = dict()
+        self.pred = dict()
+        self.index = None
+
+    def add_node(self, n, **attrs):
+        if n not in self.node:
+            self.node[n] = dict()
+            self.inserted.append(n)
+        self.node[n].update(attrs)
+        self.index = None
+
+    def add_edge(self, u, v):
+        self.succ.setdefault(u, list()).append(v)
+        self.pred.setdefault(v, list()).append(u)
+
+    def nodes(self):
+        return list(self.node.keys())
+
+    def number_of_nodes(self):
+        return len(self.node)
+
+    def number_of_edges(self):
+        return sum([len(targets) for targets in self.succ.values()])
+
+    def nbytes(self):
+        """
+        Estimates the memory footprint of the graph: the node, attribute and stored edges containers
+        and the index arrays once built.
+
+        :returns: The number of bytes
+        :rtype: *int*
+
+        """
+        containers = [self.node, self.inserted, self.succ, self.pred]
+        containers += self.node.values() + self.succ.values() + self.pred.values()
+        nbytes = sum([sys.getsizeof(c) for c in containers])
+        if self.index is not None:
+            names, positions = self.index[:2]
+            nbytes += sys.getsizeof(names) + sys.getsizeof(positions) + sum([a.nbytes for a in self.index[2:]])
+        return nbytes
+
+    def get_index(self):
+        """
+        Sorts the files by start and next dates once.
+        The files are listed as the node dictionary iterates them before "START" and "END" nodes are added,
+        i.e., in the order :func:`create_edges` creates the edges between files.
+
+        :returns: The filenames, their positions, the start and next dates, the orders by start and next dates \
+        and the sorted start and next dates
+        :rtype: *tuple*
+
+        """
+        if self.index is None:
+            files = dict()
+            for n in self.inserted:
+                if n not in ['START', 'END']:
+                    files[n] = None
+            names = list(files)
+            positions = {n: i for i, n in enumerate(names)}
+            starts = np.array([self.node[n]['start'] for n in names])
+            nexts = np.array([self.node[n]['next'] for n in names])
+            # A stable sort keeps the nodes order for equal dates
+            start_order = np.argsort(starts, kind='mergesort')
+            next_order = np.argsort(nexts, kind='mergesort')
+            self.index = (names, positions, starts, nexts,
+                          start_order, next_order, starts[start_order], nexts[next_order])
+        return self.index
+
+    def successors(self, n):
+        """
+        Gets the successors of a node.
+        The implicit edges are found by bisection on the sorted start dates.
+
+        :param str n: The node
+        :returns: The successor nodes (in edges creation order)
+        :rtype: *list*
+
+        """
+        targets = list()
+        if n not in ['START', 'END']:
+            names, positions, starts, nexts, start_order, _, sorted_starts, _ = self.get_index()
+            i = positions[n]
+            count = np.searchsorted(sorted_starts, nexts[i], side='right')
+            targets.extend([names[j] for j in np.sort(start_order[:count]) if j != i])
+        targets.extend(self.succ.get(n, list()))
+        return targets
+
+    def predecessors(self, n):
+        """
+        Gets the predecessors of a node.
+        The implicit edges are found by bisection on the sorted next dates.
+
+        :param str n: The node
+        :returns: The predecessor nodes (in edges creation order)
+        :rtype: *list*
+
+        """
+        sources = list()
+        if n not in ['START', 'END']:
+            names, positions, starts, nexts, _, next_order, _, sorted_nexts = self.get_index()
+            i = positions[n]
+            first = np.searchsorted(sorted_nexts, starts[i], side='left')
+            sources.extend([names[j] for j in np.sort(next_order[first:]) if j != i])
+        sources.extend(self.pred.get(n, list()))
+        return sources
+
+    def edges(self, n):
+        return [(n, v) for v in self.successors(n)]
+
+    @staticmethod
+    def adjacency(nodes):
+        """
+        Builds an adjacency dictionary as `networkx.DiGraph()` does by adding the edges one by one.
+
+        :param list nodes: The adjacent nodes (in edges creation order)
+        :returns: The adjacency dictionary
+        :rtype: *dict*
+
+        """
+        adjacency = dict()
+        for n in nodes:
+            adjacency[n] = None
+        return adjacency
+
+    def sweep(self):
+        """
+        Finds a shortest path between "START" and "END" nodes and counts the shortest paths.
+        The files sorted by start dates are swept level by level: a level gathers the files reached with the same
+        number of edges, i.e., the files starting before or at the latest next date of the previous levels.
+        The path walks backward through the file with the latest next date of each level.
+
+        :returns: The nodes path and the number of shortest paths (2 standing for several)
+        :rtype: *tuple*
+        :raises Error: If no path exists
+
+        """
+        names, _, starts, nexts, order, _, sorted_starts, _ = self.get_index()
+        firsts = set(self.succ.get('START', list()))
+        lasts = set(self.pred.get('END', list()))
+        if not firsts or not lasts:
+            raise NoPathFound()
+        # The first level gathers the files with the earliest start date, first in sorted order
+        lo, hi = 0, len(firsts)
+        levels = [(lo, hi)]
+        reach = nexts[order[lo:hi]].max()
+        # Number of shortest paths reaching each file of the current level
+        counts = np.ones(hi - lo, dtype=int)
+        while not lasts.intersection([names[j] for j in order[lo:hi]]):
+            previous = order[lo:hi]
+            lo, hi = hi, np.searchsorted(sorted_starts, reach, side='right')
+            if hi == lo:
+                raise NoPathFound()
+            reach = max(reach, nexts[order[lo:hi]].max())
+            levels.append((lo, hi))
+            # A file is reached from the files of the previous level with a next date after its start date
+            by_next = np.argsort(nexts[previous], kind='mergesort')
+            tails = np.append(np.minimum(np.cumsum(counts[by_next][::-1])[::-1], 2), 0)
+            counts = tails[np.searchsorted(nexts[previous][by_next], starts[order[lo:hi]], side='left')]
+        lo, hi = levels.pop()
+        ends = [k for k, j in enumerate(order[lo:hi]) if names[j] in lasts]
+        j = min([order[lo + k] for k in ends], key=lambda x: (-starts[x], names[x]))
+        path = ['END', names[j]]
+        for lo, hi in reversed(levels):
+            j = min(order[lo:hi], key=lambda x: (-nexts[x], -starts[x], names[x]))
+            path.append(names[j])
+        path.append('START')
+        return path[::-1], min(counts[ends].sum(), 2)
+
+    def bidirectional_path(self):
+        """
+        Finds the shortest path between "START" and "END" nodes as `networkx.shortest_path()` does,
+        i.e., with a bidirectional breadth-first search over the adjacency dictionaries.
+
+        :returns: The nodes path
+        :rtype: *list*
+        :raises Error: If no path exists
+
+        """
+        pred = {'START': None}
+        succ = {'END': None}
+        forward_fringe = ['START']
+        reverse_fringe = ['END']
+        while forward_fringe and reverse_fringe:
+            if len(forward_fringe) <= len(reverse_fringe):
+                this_level, forward_fringe = forward_fringe, list()
+                for v in this_level:
+                    for w in self.adjacency(self.successors(v)):
+                        if w not in pred:
+                            forward_fringe.append(w)
+                            pred[w] = v
+                        if w in succ:
+                            return self.join(pred, succ, w)
             else:
-                try:
-                    key, score = process.extractOne(attribute, attrs, scorer=fuzz.partial_ratio)
-                    if score >= 80:
-                        Print.warning('Consider "{}" attribute instead of "frequency"'.format(key))
-                        return attrs(key)
-                    else:
-                        raise NoNetCDFAttribute(attribute, self.ffp)
-                except:
-                    raise NoNetCDFAttribute(attribute, self.ffp)
+                this_level, reverse_fringe = reverse_fringe, list()
+                for v in this_level:
+                    for w in self.adjacency(self.predecessors(v)):
+                        if w not in succ:
+                            succ[w] = v
+                            reverse_fringe.append(w)
+                        if w in pred:
+                            return self.join(pred, succ, w)
+        raise NoPathFound()
+
+    @staticmethod
+    def join(pred, succ, w):
+        """
+        Builds the path from the search trees of both directions.
+
+        :param dict pred: The forward search tree
+        :param dict succ: The backward search tree
+        :param str w: The meeting node
+        :returns: The nodes path
+        :rtype: *list*
+
+        """
+        path = list()
+        while w is not None:
+            path.append(w)
+            w = pred[w]
+        path.reverse()
+        w = succ[path[-1]]
+        while w is not None:
+            path.append(w)
+            w = succ[w]
+        return path
+
+    def shortest_path(self):
+        """
+        Finds the shortest path between "START" and "END" nodes.
+        A unique shortest path is the one found by the sweep. Otherwise, the tie is broken as networkx does.
+
+        :returns: The nodes path
+        :rtype: *list*
+        :raises Error: If no path exists
+
+        """
+        path, count = self.sweep()
+        if count == 1:
+            return path
+        return self.bidirectional_path()
+
 
 class Graph(object):
     """
-    Handler providing methods to deal with Directed graph.
+    Registry of the directed graphs, one per dataset.
+    The stored graphs are handed out without copy.
+
+    :param str backend: The graph backend ("numpy" or "networkx")
 
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, backend='numpy'):
+        self.backend = backend
+        self.graphs = dict()
 
     def has_graph(self, i):
-        return True if hasattr(self, i) else False
+        return i in self.graphs
 
-    def set_graph(self, i, g=DiGraph()):
-        setattr(self, i, copy(g))
+    def set_graph(self, i):
+        if self.backend == 'networkx':
+            from networkx import DiGraph
+            self.graphs[i] = DiGraph()
+        else:
+            self.graphs[i] = IntervalGraph()
 
     def get_graph(self, i):
-        return copy(getattr(self, i))
+        return self.graphs[i]
 
-    def add_node(self, i, filename, start=None, end=None, next=None, path=None):
-        g = getattr(self, i)
+    def add_node(self, i, filename, start=None, end=None, next=None, path=None,
+                 first_step=None, last_step=None, length=None):
+        g = self.graphs[i]
         g.add_node(filename,
                    start=start,
                    end=end,
                    next=next,
-                   path=path)
+                   path=path,
+                   first_step=first_step,
+                   last_step=last_step,
+                   length=length)
         return g.node[filename]
 
     def add_edge(self, i, node_src, node_dst):
-        g = getattr(self, i)
-        g.add_edge(node_src, node_dst)
+        self.graphs[i].add_edge(node_src, node_dst)
+
+    def size(self, i):
+        """
+        Gets the number of nodes and stored edges of a graph, with an estimate of its memory footprint in bytes.
+        The estimate sums the node, attribute and adjacency containers (and the index arrays of an `IntervalGraph`).
+        The node names and the attribute values are shared with the filename handlers and are not counted.
+
+        :param str i: The graph id
+        :returns: The number of nodes, edges and bytes
+        :rtype: *tuple*
+
+        """
+        g = self.graphs[i]
+        if self.backend == 'networkx':
+            containers = [g._node, g._succ, g._pred] + g._node.values() + g._succ.values() + g._pred.values()
+            # Edge attributes are shared by both adjacency directions
+            containers += [attrs for adjacency in g._succ.values() for attrs in adjacency.values()]
+            nbytes = sum([sys.getsizeof(c) for c in containers])
+        else:
+            nbytes = g.nbytes()
+        return g.number_of_nodes(), g.number_of_edges(), nbytes
 
     def __call__(self, *args, **kwargs):
-        return [id for id in self.__dict__]
+        return self.graphs.keys()
+
+
+class PatternIndex(object):
+    """
+    Index of the filename patterns declared by the dr2xml file definitions.
+    Each pattern is dictionary-encoded once and holds a bitset of the years it is declared for,
+    the bit ``i`` standing for the year ``origin + i``.
+
+    """
+
+    def __init__(self):
+        self.ids = dict()
+        self.bits = list()
+        self.origin = None
+
+    def add(self, year, patterns):
+        """
+        Records the patterns declared for a year.
+
+        :param str year: The year (from the file definition directory name)
+        :param list patterns: The filename patterns
+
+        """
+        try:
+            year = int(year)
+        except ValueError:
+            # Not a year directory, never looked up
+            return
+        if self.origin is None:
+            self.origin = year
+        elif year < self.origin:
+            # Rebase all bitsets on the new origin
+            shift = self.origin - year
+            self.bits = [b << shift for b in self.bits]
+            self.origin = year
+        bit = 1 << (year - self.origin)
+        for pattern in patterns:
+            i = self.ids.get(pattern)
+            if i is None:
+                i = self.ids[pattern] = len(self.bits)
+                self.bits.append(0)
+            self.bits[i] |= bit
+
+    def lookup(self, pattern, start, end):
+        """
+        Gets the years a pattern is declared for within a period.
+
+        :param str pattern: The filename pattern
+        :param int start: The first year of the period
+        :param int end: The year ending the period (excluded)
+        :returns: The bitset of the period, the bit ``i`` standing for the year ``start + i``
+        :rtype: *int*
+
+        """
+        i = self.ids.get(pattern)
+        if i is None or end <= start:
+            return 0
+        bits = self.bits[i]
+        offset = start - self.origin
+        if offset >= 0:
+            bits >>= offset
+        else:
+            bits <<= -offset
+        return bits & ((1 << (end - start)) - 1)
+
+    def digest(self):
+        """
+        Gets the digest of the indexed patterns.
+
+        :returns: The SHA1 digest
+        :rtype: *str*
+
+        """
+        offset = self.origin or 0
+        return sha1(json.dumps(sorted([(pattern, self.bits[i] << offset) for pattern, i in self.ids.items()]))).hexdigest()
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class DatasetDiff(object):
+    """
+    Diffs the supplied files against the dataset index while they are collected.
+    Iterating yields the files to process. A file recorded into the index with the same signature and evaluation
+    settings is held back instead, with its interval.
+    A dataset is unchanged if its files are exactly the indexed ones: its verdict is reused as is.
+    Otherwise, only its new or changed files are processed, the others are restored from the index.
+    The dataset index is opened by the iterating thread (e.g., the task feeder of a processes pool).
+
+    :param str cache_dir: The directory of the dataset index
+    :param str settings: The digest of the evaluation settings
+    :param iter sources: The supplied files
+    :param function callback: The function called for each held back file, if any
+    :returns: The dataset diff
+    :rtype: *DatasetDiff*
+
+    """
+
+    def __init__(self, cache_dir, settings, sources, callback=None):
+        self.cache_dir = cache_dir
+        self.settings = settings
+        self.sources = sources
+        self.callback = callback
+        # Indexed intervals and number of indexed files of each dataset (None if not indexed or outdated)
+        self.records = dict()
+        # Held back intervals of each dataset
+        self.held = dict()
+        # Datasets with new or changed files
+        self.changed = set()
+        self.signatures = dict()
+
+    def __iter__(self):
+        index = MetadataCache(self.cache_dir)
+        for ffp in self.sources:
+            gid = Filename(ffp=ffp).id
+            if gid not in self.records:
+                record = index.get_dataset(gid)
+                if record and record['settings'] == self.settings:
+                    self.records[gid] = {interval['path']: interval for interval in record['intervals']}, record
+                else:
+                    self.records[gid] = dict(), None
+            self.signatures[ffp] = index.signature(ffp)
+            interval = self.records[gid][0].get(ffp)
+            if interval and tuple(interval['signature']) == self.signatures[ffp]:
+                self.held.setdefault(gid, list()).append(interval)
+                if self.callback:
+                    self.callback()
+            else:
+                self.changed.add(gid)
+                yield ffp
+
+    def get_unchanged(self):
+        """
+        Gets the verdicts of the unchanged datasets, once all files are collected.
+
+        :returns: The number of files and the verdict of each unchanged dataset
+        :rtype: *dict*
+
+        """
+        unchanged = dict()
+        for gid, intervals in self.held.items():
+            record = self.records[gid][1]
+            if gid not in self.changed and len(intervals) == len(record['intervals']):
+                unchanged[gid] = (len(intervals), record['result'])
+        return unchanged
+
+    def get_restored(self):
+        """
+        Gets the filename handlers restored from the index for the changed datasets, once all files are collected.
+
+        :returns: The restored filename handlers of each changed dataset
+        :rtype: *dict*
+
+        """
+        unchanged = self.get_unchanged()
+        restored = dict()
+        for gid, intervals in self.held.items():
+            if gid in unchanged:
+                continue
+            for interval in intervals:
+                fh = Filename(ffp=interval['path'])
+                fh.set_interval(interval)
+                restored.setdefault(gid, list()).append(fh)
+        return restored
@@ -8,22 +8,29 @@
 """
 
 import itertools
+from hashlib import sha1
 import traceback
 from multiprocessing import Pool
-from xml.etree.ElementTree import parse
+from xml.etree.ElementTree import iterparse
 
-import nco
-import networkx as nx
 import numpy as np
 from ESGConfigParser import ExpressionNotMatch
 
 from constants import *
 from context import ProcessingContext
-from handler import Filename, Graph
+from custom_exceptions import NoPathFound
+from executor import get_plan_entry, write_plan, execute_plan
+from handler import DatasetDiff, Filename, Graph, IntervalGraph, PatternIndex
+from nctime.utils.cache import MetadataCache
 from nctime.utils.custom_print import *
 from nctime.utils.misc import ProcessContext
 from nctime.utils.time import get_next_timestep, get_last_timestep
 
+# Compiled CMIP6 filename format and the facets building a dr2xml filename pattern
+CMIP6_FILENAME_REGEX = re.compile(CMIP6_FILENAME_PATTERN)
+CMIP6_FILENAME_FACETS = [k for k in sorted(CMIP6_FILENAME_REGEX.groupindex, key=CMIP6_FILENAME_REGEX.groupindex.get)
+                         if k not in IGNORED_FACETS]
+
 
 def get_overlaps(g, shortest):
     """
@@ -32,8 +39,8 @@ def get_overlaps(g, shortest):
      * The date to cut the file in order to resolve the overlap,
      * The corresponding cutting timestep.
 
-    :param networkx.DiGraph() g: The directed graph
-    :param list shortest: The most consecutive files list (from `nx.DiGraph().shortest_path`)
+    :param networkx.DiGraph() g: The directed graph (or the equivalent *IntervalGraph*)
+    :param list shortest: The most consecutive files list (from :func:`shortest_path`)
     :returns: The filenames
     :rtype: *list*
 
@@ -56,8 +63,14 @@ def get_overlaps(g, shortest):
             cutting_timestep = None
             # Get cutting timestep only if resolve is True
             if resolve:
-                last_current_step = get_last_timestep(current_node['path'])
-                cutting_timestep = get_next_timestep(next_node['path'], last_current_step)
+                # Reuse the time axis endpoints extracted from the headers if available
+                last_current_step = current_node['last_step']
+                if last_current_step is None:
+                    last_current_step = get_last_timestep(current_node['path'])
+                cutting_timestep = get_next_timestep(next_node['path'], last_current_step,
+                                                     first_step=next_node['first_step'],
+                                                     last_step=next_node['last_step'],
+                                                     length=next_node['length'])
             overlaps['partial'][shortest[n + 1]] = next_node
             overlaps['partial'][shortest[n + 1]].update({'end_overlap': current_node['end'],
                                                          'cutting_date': current_node['next'],
@@ -69,37 +82,7 @@ def get_overlaps(g, shortest):
     return overlaps['partial'], overlaps['full']
 
 
-def resolve_overlap(ffp, pattern, from_date=None, to_date=None, cutting_timestep=None, partial=False):
-    """
-    Resolve overlapping files.
-    If full overlap, the corresponding file is removed.
-    If partial overlap, the corresponding file is truncated into a new one and the old file is removed.
-
-    :param str ffp: The file full path
-    :param str pattern: The filename pattern
-    :param int from_date: Overlap starting date
-    :param int to_date:  Overlap ending date
-    :param int cutting_timestep:  Time step to cut the file
-    :param boolean partial: Resolve partial overlap if True
-
-    """
-    directory, filename = os.path.split(ffp)
-    if partial:
-        filename_attr = re.match(pattern, filename).groupdict()
-        assert len(filename_attr['period_start']) == len(filename_attr['period_end'])
-        from_timestamp = str(from_date)[:len(filename_attr['period_start'])]
-        to_timestamp = str(to_date)[:len(filename_attr['period_end'])]
-        tmp = filename.replace(filename_attr['period_start'], from_timestamp)
-        new_filename = tmp.replace(filename_attr['period_end'], to_timestamp)
-        assert not os.path.exists(os.path.join(directory, new_filename))
-        nc = nco.Nco()
-        nc.ncks(input=ffp,
-                output=os.path.join(directory, new_filename),
-                options=['-O', '-d time,{},,1'.format(cutting_timestep)])
-    os.remove(os.path.join(ffp))
-
-
-def extract_dates(ffp):
+def extract_dates(source):
     """
     Extract dates attributes from netCDF file..
 
@@ -110,19 +93,26 @@ def extract_dates(ffp):
      * last_step = the last time axis step
      * path = the file full path
 
-    :param str ffp: The file full path to process
+    :param tuple source: The file full path to process with its MIP table and frequency (None if unknown)
 
     """
     # Get process content from process global env
     assert 'pctx' in globals().keys()
     pctx = globals()['pctx']
+    ffp, table_frequency = source
     # Block to avoid program stop if a thread fails
     try:
         # Instantiate filename handler
         fh = Filename(ffp=ffp)
+        # Read MIP table and frequency from cache or file
+        if not table_frequency:
+            table_frequency = read_table_frequency(fh, pctx)
         # Extract start and end dates from filename
+        table, frequency = table_frequency
         fh.get_start_end_dates(pattern=pctx.pattern,
-                               calendar=pctx.ref_calendar)
+                               calendar=pctx.ref_calendar,
+                               table=table,
+                               frequency=frequency)
         with pctx.lock:
             Print.debug('File: {} :: Start={}, End={}, Next={}'.format(fh.filename,
                                                                        fh.start_date,
@@ -140,12 +130,86 @@ def extract_dates(ffp):
         return None
     finally:
         # Print progress
+        file_progress(pctx)
+
+
+def file_progress(pctx):
+    """
+    Increments and prints the progress of the netCDF files processing.
+
+    :param ProcessContext pctx: The process context with the progress counter, the number of files found and the lock
+
+    """
+    with pctx.lock:
+        pctx.progress.value += 1
+        percentage = int(pctx.progress.value * 100 / pctx.nbfound.value)
+        msg = COLORS.OKBLUE('\rProcess netCDF file(s): ')
+        msg += '{}% | {}/{} files'.format(percentage, pctx.progress.value, pctx.nbfound.value)
+        Print.progress(msg)
+
+
+def read_table_frequency(fh, pctx):
+    """
+    Gets the MIP table and the frequency of a file from the metadata cache if unchanged, otherwise from its header.
+    The time axis length and endpoints are recorded on the filename handler.
+
+    :param handler.Filename fh: The filename handler
+    :param ProcessContext pctx: The process context
+    :returns: The MIP table and the frequency
+    :rtype: *tuple*
+
+    """
+    table_frequency = None
+    # Get header snapshot of the unchanged file from cache
+    if pctx.cache:
+        record = pctx.cache.get(fh.ffp)
+        if record and record['header']:
+            table_frequency = record['header']['table'], record['header']['frequency']
+            fh.set_time_steps(record['header'])
         with pctx.lock:
-            pctx.progress.value += 1
-            percentage = int(pctx.progress.value * 100 / pctx.nbfiles)
-            msg = COLORS.OKBLUE('\rProcess netCDF file(s): ')
-            msg += '{}% | {}/{} files'.format(percentage, pctx.progress.value, pctx.nbfiles)
-            Print.progress(msg)
+            if table_frequency:
+                pctx.cache_hits.value += 1
+            else:
+                pctx.cache_misses.value += 1
+    # Read MIP table and frequency from file
+    if not table_frequency:
+        table_frequency = fh.get_table_frequency()
+        # Record header snapshot
+        if pctx.cache:
+            pctx.cache.put(fh.ffp, header=fh.snapshot)
+        fh.set_time_steps(fh.snapshot)
+        fh.snapshot = None
+    return table_frequency
+
+
+def resolve_table_frequency(sources, pctx):
+    """
+    Yields each supplied file with the MIP table and the frequency to use in header-free mode.
+    They are deduced from the filename facets if possible. Otherwise, the main process reads them from the first
+    file of the dataset and gives them to its other files, so that a dataset is read once whatever the number
+    of processes. A file that cannot be read is yielded without them, to be reported by :func:`extract_dates`.
+
+    :param iter sources: The supplied files
+    :param ProcessContext pctx: The process context of the main process
+    :returns: The files full paths with their MIP table and frequency (None if unknown)
+    :rtype: *iter*
+
+    """
+    # Open the metadata cache within the iterating thread (e.g., the task feeder of a processes pool)
+    pctx.cache = MetadataCache(pctx.cache_dir) if pctx.cache_dir else None
+    datasets = dict()
+    for ffp in sources:
+        fh = Filename(ffp=ffp)
+        table_frequency = fh.get_table_frequency_from_filename(pattern=pctx.pattern)
+        if not table_frequency:
+            if fh.id not in datasets:
+                try:
+                    datasets[fh.id] = read_table_frequency(fh, pctx)
+                except Exception:
+                    yield ffp, None
+                    continue
+            table_frequency = datasets[fh.id]
+        yield ffp, table_frequency
 
 
 def create_nodes(fh):
@@ -173,7 +237,10 @@ def create_nodes(fh):
                           fh.start_date,
                           fh.end_date,
                           fh.next_date,
-                          fh.ffp)
+                          fh.ffp,
+                          fh.first_step,
+                          fh.last_step,
+                          fh.length)
     Print.debug('Graph: {} :: Node {} (start={}, end={}, next={})'.format(fh.id,
                                                                           fh.filename,
                                                                           node['start'],
@@ -195,42 +262,52 @@ def create_edges(gid):
     """
     global period_start, period_end
     g = graph.get_graph(gid)
+    nodes = list(g.nodes())
+    start_dates = np.array([g.node[n]['start'] for n in nodes])
+    end_dates = np.array([g.node[n]['next'] for n in nodes])
+    # Sort nodes by start dates and next dates once
+    # A stable sort keeps the nodes order for equal dates
+    start_order = np.argsort(start_dates, kind='mergesort')
+    sorted_start_dates = start_dates[start_order]
+    end_order = np.argsort(end_dates, kind='mergesort')
+    sorted_end_dates = end_dates[end_order]
     # Create edges with backward nodes
     # A node is a "backward" node when the difference between the next current time step
     # and its start date is positive.
     # To ensure continuity path, edges has to only exist with backward nodes.
-    for node, next_date in g.nodes(data='next'):
-        # Considering one node, get the others in the graph
-        other_nodes = [x for x in g.nodes() if x is not node]
-        # Get the start dates of the other nodes
-        other_start_dates = [g.node[x]['start'] for x in other_nodes]
-        # Find the index with a positive or null different between their start date and
-        # the next date of the considered node
-        indexes = [i for i, v in enumerate(next_date - np.array(other_start_dates)) if v >= 0]
-        # Get all "next" nodes for the current node
-        next_nodes = [other_nodes[i] for i in indexes]
-        # For each next node, build the corresponding edge in the graph
-        for next_node in next_nodes:
-            graph.add_edge(gid, node, next_node)
-            Print.debug('Graph: {} :: Edge {} --> {}'.format(gid, node, next_node))
+    # Considering one node, the backward nodes are the first sorted nodes found by bisection
+    # They are kept in the graph nodes order so that the path search is unchanged
+    # Those edges are implicit in an IntervalGraph
+    if not isinstance(g, IntervalGraph):
+        counts = np.searchsorted(sorted_start_dates, end_dates, side='right')
+        for i, node in enumerate(nodes):
+            for j in np.sort(start_order[:counts[i]]):
+                if j == i:
+                    continue
+                graph.add_edge(gid, node, nodes[j])
+                if Print.DEBUG:
+                    Print.debug('Graph: {} :: Edge {} --> {}'.format(gid, node, nodes[j]))
     # Find the node(s) with the earliest date if no period start submitted
-    start_dates = zip(*g.nodes(data='start'))[1]
-    starts = [n for n in g.nodes() if g.nodes[n]['start'] == min(start_dates)]
+    starts = [nodes[j] for j in np.sort(start_order[:np.searchsorted(sorted_start_dates,
+                                                                      sorted_start_dates[0],
+                                                                      side='right')])]
     # Find the node(s) with the latest date
-    end_dates = zip(*g.nodes(data='next'))[1]
-    ends = [n for n in g.nodes() if g.nodes[n]['next'] == max(end_dates)]
+    ends = [nodes[j] for j in np.sort(end_order[np.searchsorted(sorted_end_dates,
+                                                                sorted_end_dates[-1],
+                                                                side='left'):])]
+    first_date, last_date = sorted_start_dates[0].item(), sorted_end_dates[-1].item()
     # Build starting node with edges to first node(s)
     # If no start date submitted for the covered period,
     # Or if the submitted start date is higher than the min of start time stamps
     # Set START node date as the min of time stamps.
-    if not period_start or period_start > min(start_dates):
-        start_node_date = min(start_dates)
+    if not period_start or period_start > first_date:
+        start_node_date = first_date
     else:
     # If start date submitted set it as START node date
         start_node_date = period_start
     graph.add_node(gid, 'START', start=start_node_date, end=start_node_date, next=start_node_date)
     # Build starting edge only if at least one file covers the start date of the period
-    if start_node_date >= min(start_dates):
+    if start_node_date >= first_date:
         for start in starts:
             graph.add_edge(gid, 'START', start)
             Print.debug('Graph: {} :: Edge START --> {}'.format(gid, start))
@@ -238,19 +315,39 @@ def create_edges(gid):
     # If no end date submitted for the covered period,
     # Or if the submitted end date is lower than the max of end time stamps
     # Set END node date as the max of time stamps.
-    if not period_end or period_end < max(end_dates):
-        end_node_date = max(end_dates)
+    if not period_end or period_end < last_date:
+        end_node_date = last_date
     else:
     # If end date submitted set it as END node date
         end_node_date = period_end
     graph.add_node(gid, 'END', start=end_node_date, end=end_node_date, next=end_node_date)
     # Build ending edge only if at least one file covers the end date of the period
-    if end_node_date <= max(end_dates):
+    if end_node_date <= last_date:
         for end in ends:
             graph.add_edge(gid, end, 'END')
             Print.debug('Graph: {} :: Edge {} --> END'.format(gid, end))
 
 
+def shortest_path(g):
+    """
+    Finds the shortest path between "START" and "END" nodes depending on the graph backend.
+    The networkx library is only imported if used as backend.
+
+    :param networkx.DiGraph() g: The directed graph (or the equivalent *IntervalGraph*)
+    :returns: The nodes path
+    :rtype: *list*
+    :raises Error: If no path exists
+
+    """
+    if isinstance(g, IntervalGraph):
+        return g.shortest_path()
+    import networkx as nx
+    try:
+        return nx.shortest_path(g, source='START', target='END')
+    except nx.NetworkXNoPath:
+        raise NoPathFound()
+
+
 def evaluate_graph(gid):
     """
     Evaluate the directed graph looking for a shortest path between "START" and "END" nodes.
@@ -264,62 +361,47 @@ def evaluate_graph(gid):
     g = graph.get_graph(gid)
     path = list()
     full_overlaps, partial_overlaps = None, None
-    Print.debug('Process graph: {}'.format(gid))
     # Walk through the graph
     try:
         # Find shortest path between oldest and latest dates
-        path = nx.shortest_path(g, source='START', target='END')
+        path = shortest_path(g)
         # Get overlaps
         partial_overlaps, full_overlaps = get_overlaps(g, path)
-    except nx.NetworkXNoPath:
+    except NoPathFound:
         nodes = ['START']
         nodes.extend(sorted([x for x in g.nodes() if x not in ['START', 'END']]))
         nodes.append('END')
+        # Sort all nodes by start dates once, as for the edges creation
+        all_nodes = list(g.nodes())
+        start_dates = np.array([g.node[x]['start'] for x in all_nodes])
+        start_order = np.argsort(start_dates, kind='mergesort')
+        sorted_start_dates = start_dates[start_order]
         for node in nodes:
             path.append(node)
             # A node is a "forward" node when the difference between the next current time step
-            # and its start date is negative.
+            # and its start date is negative or null.
             # A path gap exists from a node when no edges exist with ALL "forwards" nodes.
-            # Considering one node, get the others in the graph
-            other_nodes = [x for x in g.nodes() if x is not node]  # not in ['START', node, 'END']]
-            # Get the start dates of the other nodes
-            other_start_dates = [g.node[x]['start'] for x in other_nodes]
-            # Find the index with a negative or null difference between their start date and
-            # the next date of the considered node
-            a = g.node[node]['next']
-            b = np.array(other_start_dates)
-            indexes = [i for i, v in enumerate(g.node[node]['next'] - np.array(other_start_dates)) if v <= 0]
-            # Get all "next" nodes for the current node
-            next_nodes = [other_nodes[i] for i in indexes]
+            # Considering one node, the "forward" nodes are the other sorted nodes found by bisection
+            first = np.searchsorted(sorted_start_dates, g.node[node]['next'], side='left')
+            next_nodes = set([all_nodes[j] for j in start_order[first:]]).difference([node])
             # Find available targets from graph
             try:
                 avail_targets = zip(*g.edges(node))[1]
             except IndexError:
                 avail_targets = []
             # If no "forward" nodes in edges target and not last node = potential BREAK
-            if not set(next_nodes).intersection(avail_targets) and node != nodes[-1]:
+            if not next_nodes.intersection(avail_targets) and node != nodes[-1]:
                 if patterns:
                     # Get gap start year from current node
                     gap_start_year = int(float(str(g.node[node]['next'])[:4]))
                     # Get gap end year from next node in list
                     gap_end_year = int(float(str(g.node[nodes[nodes.index(node) + 1]]['start'])[:4]))
                     # Get filename pattern to search into XML files
-                    facets = re.compile(CMIP6_FILENAME_PATTERN).groupindex
-                    try:
-                        attributes = re.search(CMIP6_FILENAME_PATTERN, node).groupdict()
-                    except:
-                        raise ExpressionNotMatch(node, CMIP6_FILENAME_PATTERN)
-                    filename_pattern = list()
-                    for idx in sorted(facets.values()):
-                        key = facets.keys()[facets.values().index(idx)]
-                        if key not in IGNORED_FACETS:
-                            filename_pattern.append(attributes[key])
-                    filename_pattern = '_'.join(filename_pattern) + '_{}-{}'.format('%start_date%', '%end_date%')
-                    if node.endswith('-clim.nc'):
-                        filename_pattern += '-clim'
+                    filename_pattern = get_filename_pattern(node)
                     # Check into XML files in the gap period
+                    found = patterns.lookup(filename_pattern, gap_start_year, gap_end_year)
                     for year in range(gap_start_year, gap_end_year):
-                        if filename_pattern in patterns[str(year)]:
+                        if found >> (year - gap_start_year) & 1:
                             Print.debug('Pattern found in XML :: Year = {} :: {}'.format(year, filename_pattern))
                             path.append('BREAK')
                         else:
@@ -375,35 +457,88 @@ def yield_filedef(paths):
                     yield ffp
 
 
+def get_filename_pattern(filename):
+    """
+    Gets the dr2xml filename pattern of a CMIP6 file.
+
+    :param str filename: The filename
+    :returns: The filename pattern as declared into dr2xml files
+    :rtype: *str*
+
+    """
+    try:
+        attributes = CMIP6_FILENAME_REGEX.search(filename).groupdict()
+    except AttributeError:
+        raise ExpressionNotMatch(filename, CMIP6_FILENAME_PATTERN)
+    filename_pattern = '_'.join([attributes[key] for key in CMIP6_FILENAME_FACETS])
+    filename_pattern += '_{}-{}'.format('%start_date%', '%end_date%')
+    if filename.endswith('-clim.nc'):
+        filename_pattern += '-clim'
+    return filename_pattern
+
+
+def parse_filedef(path):
+    """
+    Streams a dr2xml file and gets its file_id entries.
+    Each element is released as soon as it is parsed.
+
+    :param str path: The dr2xml file path
+    :returns: The file_id entries
+    :rtype: *list*
+
+    """
+    patterns = list()
+    depth = 0
+    for event, elem in iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+        # Only consider <file> entries of the second level (i.e., "*/file" from root)
+        if depth == 3 and elem.tag == 'file':
+            # Get XML file_id entry name
+            item = elem.attrib['name'].strip()
+            # Ignore "cfsites_grid" entry
+            if item != 'cfsites_grid':
+                patterns.append(item)
+        depth -= 1
+        if depth:
+            elem.clear()
+    return patterns
+
+
 def get_patterns_from_filedef(path):
     """
     Parses dr2xml files.
-    Each filename pattern is deserialized as a dictionary of facet: value.
+    The file_id entries of an unchanged file are read from the metadata cache if enabled.
 
     :param str path: The path to scan
-    :returns: The filename deserialized with facets
-    :rtype: *dict*
+    :returns: The file definition year and its file_id entries
+    :rtype: *tuple*
 
     """
     # Get process content from process global env
     assert 'pctx' in globals().keys()
     pctx = globals()['pctx']
-    with pctx.lock:
-        Print.debug(COLOR().bold('Parse XML filedef :: ') + path)
     year = os.path.basename(os.path.dirname(path))
-    xml_tree = parse(path)
-    patterns = list()
-    for item in xml_tree.iterfind('*/file'):
-        # Get XML file_id entry name
-        item = item.attrib['name'].strip()
-        # Ignore "cfsites_grid" entry
-        if item == 'cfsites_grid':
-            continue
-        with pctx.lock:
-            Print.debug('Process XML file_id entry :: {}'.format(item))
-        patterns.append(item)
-    # Print progress
+    patterns = None
+    if pctx.cache:
+        patterns = pctx.cache.get_filedef(path)
+    cached = patterns is not None
+    if not cached:
+        patterns = parse_filedef(path)
+        if pctx.cache:
+            pctx.cache.put_filedef(path, patterns)
     with pctx.lock:
+        if pctx.cache:
+            if cached:
+                pctx.cache_hits.value += 1
+            else:
+                pctx.cache_misses.value += 1
+        Print.debug(COLOR().bold('Parse XML filedef :: ') + path)
+        if Print.DEBUG:
+            for item in patterns:
+                Print.debug('Process XML file_id entry :: {}'.format(item))
+        # Print progress
         pctx.progress.value += 1
         percentage = int(pctx.progress.value * 100 / pctx.nbxml)
         msg = COLORS.OKBLUE('\rProcess XML file(s): ')
@@ -414,6 +549,62 @@ def get_patterns_from_filedef(path):
     return year, patterns
 
 
+def process_graph(dataset):
+    """
+    Builds and evaluates the directed graph of a dataset.
+    Only the evaluation results and the graph size are sent back to the main process.
+
+    :param tuple dataset: The dataset id and the list of its filename handlers
+    :returns: The node path, the partial overlaps and the full overlaps, \
+    with the numbers of nodes, stored edges and bytes of the graph (None if the dataset fails)
+    :rtype: *tuple*
+
+    """
+    # Get process content from process global env
+    assert 'pctx' in globals().keys()
+    pctx = globals()['pctx']
+    global graph, patterns, resolve, period_start, period_end
+    patterns = pctx.patterns
+    resolve = pctx.resolve
+    period_start = pctx.period_start
+    period_end = pctx.period_end
+    gid, handlers = dataset
+    # Block to avoid program stop if a dataset fails (e.g., unreadable file or missing cutting timestep)
+    try:
+        graph = Graph(backend=pctx.graph_backend)
+        # Process filename handlers to create nodes
+        for fh in handlers:
+            create_nodes(fh)
+        # Create appropriate edges
+        create_edges(gid)
+        # Evaluate the graph if a shortest path exist
+        result = evaluate_graph(gid)
+        # Get the graph size once evaluated (i.e., including the index arrays if any)
+        size = graph.size(gid)
+        Print.debug('Process graph: {} :: {} node(s), {} stored edge(s), {} byte(s)'.format(gid, *size))
+        return result, size
+    except KeyboardInterrupt:
+        raise
+    except Exception:
+        exc = traceback.format_exc().splitlines()
+        msg = COLORS.HEADER(gid)
+        msg += """\n        Status: {}""".format(COLORS.FAIL('Skipped'))
+        msg += """\n        {}""".format(exc[0])
+        msg += """\n      """
+        msg += """\n      """.join(exc[1:])
+        with pctx.lock:
+            Print.error(msg, buffer=True)
+        return None
+    finally:
+        # Print progress
+        with pctx.lock:
+            pctx.progress.value += 1
+            percentage = int(pctx.progress.value * 100 / pctx.nbdsets)
+            msg = COLORS.OKBLUE('\rProcess dataset(s): ')
+            msg += '{}% | {}/{} datasets'.format(percentage, pctx.progress.value, pctx.nbdsets)
+            Print.progress(msg)
+
+
 def initializer(keys, values):
     """
     Initialize process context by setting particular variables as global variables.
@@ -425,6 +616,8 @@ def initializer(keys, values):
     assert len(keys) == len(values)
     global pctx
     pctx = ProcessContext({key: values[i] for i, key in enumerate(keys)})
+    # Open the metadata cache within each process
+    pctx.cache = MetadataCache(pctx.cache_dir) if pctx.cache_dir else None
 
 
 def run(args=None):
@@ -441,71 +634,128 @@ def run(args=None):
     :param ArgumentParser args: Command-line arguments parser
 
     """
-    # Declare global variables
-    global graph, patterns, resolve, period_start, period_end
     # Instantiate processing context
     with ProcessingContext(args) as ctx:
         # Collecting data
         Print.progress('\rCollecting data, please wait...')
-        # Get number of files
-        ctx.nbfiles = len(ctx.sources)
+        # Files are processed while collected
+        sources = ctx.sources
         # Init process context
         cctx = {name: getattr(ctx, name) for name in PROCESS_VARS}
-        if ctx.use_pool:
-            # Init processes pool
-            pool = Pool(processes=ctx.processes, initializer=initializer, initargs=(cctx.keys(), cctx.values()))
-            # Process supplied files to create nodes in appropriate directed graph
-            processes = pool.imap(extract_dates, ctx.sources)
-        else:
-            initializer(cctx.keys(), cctx.values())
-            processes = itertools.imap(extract_dates, ctx.sources)
-        # Process supplied sources
-        handlers = [x for x in processes if x is not None]
-        # Close pool of workers if exists
-        if 'pool' in locals().keys():
-            locals()['pool'].close()
-            locals()['pool'].join()
-        # Get number of files skipped
-        ctx.skip = ctx.nbfiles - len(handlers)
         # Process XML files if card
-        Print.progress('\n')
-        patterns = dict()
+        patterns = PatternIndex()
         if ctx.xml:
-            # Reset progress counter
-            cctx['progress'].value = 0
-            # Get number of xml
-            ctx.nbxml = len([x for x in yield_filedef(ctx.xml)])
+            # Get xml files and their number
+            filedefs = list(yield_filedef(ctx.xml))
+            ctx.nbxml = len(filedefs)
             cctx['nbxml'] = ctx.nbxml
             if ctx.use_pool:
                 # Init processes pool
                 pool = Pool(processes=ctx.processes, initializer=initializer, initargs=(cctx.keys(),
                                                                                         cctx.values()))
-                for k, v in pool.imap(get_patterns_from_filedef, yield_filedef(ctx.xml)):
-                    if k not in patterns.keys():
-                        patterns[k] = list()
-                    patterns[k].extend(v)
+                for k, v in pool.imap(get_patterns_from_filedef, filedefs):
+                    patterns.add(k, v)
                 # Close pool of workers
                 pool.close()
                 pool.join()
             else:
                 initializer(cctx.keys(), cctx.values())
-                for k, v in itertools.imap(get_patterns_from_filedef, yield_filedef(ctx.xml)):
-                    if k not in patterns.keys():
-                        patterns[k] = list()
-                    patterns[k].extend(v)
+                for k, v in itertools.imap(get_patterns_from_filedef, filedefs):
+                    patterns.add(k, v)
             Print.progress('\n')
-        # Initialize Graph()
-        graph = Graph()
-        global period_start
-        period_start = ctx.period_start
-        period_end = ctx.period_end
-        # Process filename handler to create nodes
-        ctx.nbnodes = len([x for x in itertools.imap(create_nodes, handlers)])
-        # Process each directed graph to create appropriate edges
-        ctx.nbdsets = len([x for x in itertools.imap(create_edges, graph())])
-        # Evaluate each graph if a shortest path exist
-        resolve = ctx.resolve
-        for path, partial_overlaps, full_overlaps in itertools.imap(evaluate_graph, graph()):
+        # Reset progress counter
+        cctx['progress'].value = 0
+        # Diff supplied files against the dataset index while collected
+        index, settings, diff = None, None, None
+        unchanged, dataset_handlers, signatures = dict(), dict(), dict()
+        if ctx.cache_dir:
+            index = MetadataCache(ctx.cache_dir)
+            settings = sha1(repr((ctx.settings, patterns.digest()))).hexdigest()
+            # Files held back from the index are counted as processed
+            dctx = ProcessContext(cctx)
+            diff = DatasetDiff(ctx.cache_dir, settings, ctx.sources, callback=lambda: file_progress(dctx))
+            sources = diff
+        if ctx.header_free:
+            # MIP tables and frequencies not given by the filenames are read once per dataset by the main process
+            sources = resolve_table_frequency(sources, ProcessContext(cctx))
+        else:
+            sources = itertools.izip(sources, itertools.repeat(None))
+        if ctx.use_pool:
+            # Init processes pool
+            pool = Pool(processes=ctx.processes, initializer=initializer, initargs=(cctx.keys(), cctx.values()))
+            # Process supplied files to create nodes in appropriate directed graph
+            processes = pool.imap(extract_dates, sources)
+        else:
+            initializer(cctx.keys(), cctx.values())
+            processes = itertools.imap(extract_dates, sources)
+        # Process supplied sources
+        handlers = [x for x in processes if x is not None]
+        # Close pool of workers if exists
+        if ctx.use_pool:
+            pool.close()
+            pool.join()
+        # Get number of files (already collected while processing)
+        ctx.nbfiles = len(ctx.sources)
+        # Files of unchanged datasets and unchanged files of changed datasets are restored from the index
+        if diff:
+            unchanged, dataset_handlers, signatures = diff.get_unchanged(), diff.get_restored(), diff.signatures
+        # Get number of files skipped
+        ctx.skip = ctx.nbfiles - len(handlers) - sum([len(x) for x in dataset_handlers.values()]) - \
+            sum([n for n, _ in unchanged.values()])
+        Print.progress('\n')
+        # Group filename handlers per dataset
+        for fh in handlers:
+            dataset_handlers.setdefault(fh.id, list()).append(fh)
+        ctx.nbnodes = sum([len(x) for x in dataset_handlers.values()]) + sum([n for n, _ in unchanged.values()])
+        ctx.nbdsets = len(dataset_handlers) + len(unchanged)
+        ctx.nbreused = len(unchanged)
+        # Build and evaluate the directed graph of each new or changed dataset
+        cctx['progress'].value = 0
+        cctx['nbdsets'] = len(dataset_handlers)
+        cctx['patterns'] = patterns
+        # Cutting timesteps are required to plan the resolution
+        cctx['resolve'] = ctx.resolve or bool(ctx.plan)
+        cctx['period_start'] = ctx.period_start
+        cctx['period_end'] = ctx.period_end
+        cctx['graph_backend'] = ctx.graph_backend
+        if ctx.use_pool:
+            # Init processes pool
+            pool = Pool(processes=ctx.processes, initializer=initializer, initargs=(cctx.keys(), cctx.values()))
+            processes = pool.imap(process_graph, dataset_handlers.items())
+        else:
+            initializer(cctx.keys(), cctx.values())
+            processes = itertools.imap(process_graph, dataset_handlers.items())
+        results = dict()
+        for gid, result in zip(dataset_handlers.keys(), processes):
+            # The dataset failed and is neither reported nor indexed
+            if result is None:
+                ctx.nberrors += 1
+                continue
+            result, size = result
+            results[gid] = result
+            # Keep the size of the largest graph
+            if not ctx.largest_graph or size[2] > ctx.largest_graph[2]:
+                ctx.largest_graph = size
+            # Record the sorted file intervals and the verdict into the dataset index
+            if index:
+                intervals = list()
+                for fh in sorted(dataset_handlers[gid], key=lambda x: (x.start_date, x.filename)):
+                    interval = fh.get_interval()
+                    interval['signature'] = signatures[fh.ffp]
+                    intervals.append(interval)
+                index.put_dataset(gid, settings, intervals, result)
+        # Close pool of workers if exists
+        if ctx.use_pool:
+            pool.close()
+            pool.join()
+        for gid, (_, result) in unchanged.items():
+            results[gid] = result
+        if dataset_handlers:
+            Print.progress('\n')
+        # Flush buffer
+        Print.flush()
+        entries = list()
+        for gid, (path, partial_overlaps, full_overlaps) in results.items():
             # Format message about path
             msg = format_path(path, partial_overlaps, full_overlaps)
             # If broken time series
@@ -521,21 +771,23 @@ def run(args=None):
                     Print.error(COLORS.FAIL('Continuous time series with overlaps: ') + msg)
                 else:
                     Print.success(COLORS.SUCCESS('Continuous time series: ') + msg)
-            # Resolve overlaps
-            if resolve:
-                # Full overlapping files has to be deleted before partial overlapping files are truncated.
-                for node in full_overlaps:
-                    resolve_overlap(ffp=full_overlaps[node]['path'],
-                                    pattern=ctx.pattern,
-                                    partial=False)
-                if not ctx.full_only:
-                    for node in partial_overlaps:
-                        resolve_overlap(ffp=partial_overlaps[node]['path'],
-                                        pattern=ctx.pattern,
-                                        from_date=partial_overlaps[node]['cutting_date'],
-                                        to_date=partial_overlaps[node]['end'],
-                                        cutting_timestep=partial_overlaps[node]['cutting_timestep'],
-                                        partial=True)
+            # Plan overlaps resolution
+            if ctx.resolve or ctx.plan:
+                entry = get_plan_entry(gid=gid,
+                                       partial_overlaps=partial_overlaps,
+                                       full_overlaps=full_overlaps,
+                                       pattern=ctx.pattern,
+                                       full_only=ctx.full_only)
+                if entry:
+                    entries.append(entry)
+        # Write resolution plan
+        if ctx.plan:
+            write_plan(ctx.plan, entries)
+        # Resolve overlaps
+        # Full overlapping files has to be deleted before partial overlapping files are truncated within each dataset.
+        if ctx.resolve:
+            execute_plan(ctx, entries)
+            Print.flush()
     # Evaluate errors and exit with appropriate return code
     if ctx.overlaps or ctx.broken or ctx.nberrors:
         sys.exit(ctx.broken + ctx.overlaps + ctx.nberrors)
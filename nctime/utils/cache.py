@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Persistent cache of netCDF file metadata and diagnostics.
+
+"""
+
+import json
+import sqlite3
+
+from constants import CACHE_FILENAME, CACHE_TIMEOUT
+from custom_print import *
+
+
+class MetadataCache(object):
+    """
+    Persistent store of netCDF file metadata shared by nctxck and nctcck.
+    Each record is keyed by the file full path and is only valid while the file inode, size and modification time
+    are unchanged. A record gathers:
+
+     * The header snapshot (table, frequency, time units, calendar, length, first and last values, time boundaries),
+     * The settings digest and the status codes of the last time axis diagnostic.
+
+    The file_id entries parsed from dr2xml files are recorded the same way in a separate table.
+    The nctcck dataset index records the sorted file intervals and the verdict of each dataset.
+
+    The sqlite connection is opened per process and records are committed one by one
+    so that several processes can share the same cache file.
+
+    :param str directory: The cache directory
+    :returns: The metadata cache
+    :rtype: *MetadataCache*
+
+    """
+
+    def __init__(self, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.path = os.path.join(directory, CACHE_FILENAME)
+        self.db = sqlite3.connect(self.path, timeout=CACHE_TIMEOUT)
+        with self.db:
+            self.db.execute('CREATE TABLE IF NOT EXISTS files ('
+                            'path TEXT PRIMARY KEY, inode INTEGER, size INTEGER, mtime REAL, '
+                            'header TEXT, settings TEXT, status TEXT)')
+            self.db.execute('CREATE TABLE IF NOT EXISTS filedefs ('
+                            'path TEXT PRIMARY KEY, inode INTEGER, size INTEGER, mtime REAL, patterns TEXT)')
+            self.db.execute('CREATE TABLE IF NOT EXISTS datasets ('
+                            'id TEXT PRIMARY KEY, settings TEXT, intervals TEXT, result TEXT)')
+
+    @staticmethod
+    def signature(ffp):
+        """
+        Get the file signature used to validate a record.
+
+        :param str ffp: The file full path
+        :returns: The file inode, size and modification time
+        :rtype: *tuple*
+
+        """
+        st = os.stat(ffp)
+        return st.st_ino, st.st_size, st.st_mtime
+
+    def get(self, ffp):
+        """
+        Get the record of an unchanged file.
+
+        :param str ffp: The file full path
+        :returns: The record as a dictionary with "header", "settings" and "status" keys, None if missing or outdated
+        :rtype: *dict*
+
+        """
+        row = self.db.execute('SELECT inode, size, mtime, header, settings, status FROM files WHERE path = ?',
+                              (ffp,)).fetchone()
+        if not row or tuple(row[:3]) != self.signature(ffp):
+            return None
+        return {'header': json.loads(row[3]) if row[3] else None,
+                'settings': row[4],
+                'status': json.loads(row[5]) if row[5] is not None else None}
+
+    def put(self, ffp, header=None, settings=None, status=None):
+        """
+        Record metadata of a file.
+        Fields of a valid record are updated only if submitted, an outdated record is replaced.
+
+        :param str ffp: The file full path
+        :param dict header: The header snapshot (from :func:`header_snapshot`)
+        :param str settings: The digest of the diagnostic settings
+        :param list status: The diagnostic status codes
+
+        """
+        record = self.get(ffp) or dict()
+        if header is not None:
+            record['header'] = header
+        if status is not None:
+            record['settings'] = settings
+            record['status'] = status
+        inode, size, mtime = self.signature(ffp)
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                            (ffp, inode, size, mtime,
+                             json.dumps(record['header']) if record.get('header') else None,
+                             record.get('settings'),
+                             json.dumps(record['status']) if record.get('status') is not None else None))
+
+    def get_filedef(self, ffp):
+        """
+        Get the file_id entries of an unchanged dr2xml file.
+
+        :param str ffp: The dr2xml file full path
+        :returns: The file_id entries, None if missing or outdated
+        :rtype: *list*
+
+        """
+        row = self.db.execute('SELECT inode, size, mtime, patterns FROM filedefs WHERE path = ?',
+                              (ffp,)).fetchone()
+        if not row or tuple(row[:3]) != self.signature(ffp):
+            return None
+        return json.loads(row[3])
+
+    def put_filedef(self, ffp, patterns):
+        """
+        Record the file_id entries of a dr2xml file.
+
+        :param str ffp: The dr2xml file full path
+        :param list patterns: The file_id entries
+
+        """
+        inode, size, mtime = self.signature(ffp)
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO filedefs VALUES (?, ?, ?, ?, ?)',
+                            (ffp, inode, size, mtime, json.dumps(patterns)))
+
+    def get_dataset(self, gid):
+        """
+        Get the index record of a dataset.
+
+        :param str gid: The dataset id
+        :returns: The record as a dictionary with "settings", "intervals" and "result" keys, None if missing
+        :rtype: *dict*
+
+        """
+        row = self.db.execute('SELECT settings, intervals, result FROM datasets WHERE id = ?', (gid,)).fetchone()
+        if not row:
+            return None
+        return {'settings': row[0],
+                'intervals': json.loads(row[1]),
+                'result': json.loads(row[2])}
+
+    def put_dataset(self, gid, settings, intervals, result):
+        """
+        Record the index of a dataset.
+
+        :param str gid: The dataset id
+        :param str settings: The digest of the evaluation settings
+        :param list intervals: The file intervals with their signature, sorted by start date
+        :param tuple result: The dataset verdict (i.e., the node path, the partial and full overlaps)
+
+        """
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?)',
+                            (gid, settings,
+                             json.dumps(intervals, default=scalar),
+                             json.dumps(result, default=scalar)))
+
+
+def scalar(obj):
+    """
+    Converts a numpy scalar into the corresponding Python object for JSON serialization.
+
+    :param numpy.generic obj: The numpy scalar
+    :returns: The Python scalar
+    :rtype: *int* or *float*
+
+    """
+    return obj.item()
+
+
+def header_snapshot(header, table, frequency):
+    """
+    Builds the header snapshot to cache from a netCDF header.
+
+    :param NetCDFHeader header: The netCDF header
+    :param str table: The MIP table
+    :param str frequency: The frequency
+    :returns: The header snapshot
+    :rtype: *dict*
+
+    """
+    time_attrs = header.time_attrs or dict()
+    return {'table': table,
+            'frequency': frequency,
+            'units': time_attrs.get('units'),
+            'calendar': time_attrs.get('calendar'),
+            'length': header.length,
+            'first': float(header.time_first) if header.time_first is not None else None,
+            'last': float(header.time_last) if header.time_last is not None else None,
+            'bounds': header.tbnds}
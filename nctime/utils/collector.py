@@ -10,10 +10,16 @@
 import os
 import re
 import sys
+from multiprocessing.pool import ThreadPool
 from uuid import uuid4 as uuid
 
+try:
+    from os import scandir
+except ImportError:
+    from scandir import scandir
+
+from constants import FILTER_CACHE_SIZE, MANIFEST_BATCH_SIZE
 from custom_exceptions import NoFileFound
-from nctime.utils.misc import match
 
 
 class Collecting:
@@ -42,35 +48,185 @@ class Collecting:
 class Collector(object):
     """
     Base collector class to yield regular NetCDF files.
+    The sources are walked once with scandir: the file type is taken from the directory entry without extra stat call.
+    The files found are recorded on the fly so that any further iteration reuses them.
+    Subdirectories not passing the path filter are pruned: the ignored branches are never listed.
+    The files listed in a manifest are collected after the sources without any walk.
 
     :param list sources: The list of sources to parse
+    :param multiprocessing.Value counter: The shared counter of files found so far (optional)
+    :param int threads: The number of threads listing directories concurrently (1 walks sequentially)
+    :param str manifest: The manifest listing the files to collect, "-" for the standard input (optional)
     :returns: The data collector
     :rtype: *iter*
 
     """
 
-    def __init__(self, sources, spinner=False):
+    # Manifest line as an ESGF mapfile line (i.e., "dataset_id | path | size | ...")
+    MAPFILE_LINE = re.compile(r'^[^|]*\|\s*(?P<path>[^|]*[^|\s])\s*(?:\|.*)?$')
+    # Manifest line as a path optionally followed by both the size and modification time columns
+    MANIFEST_LINE = re.compile(r'^(?P<path>.*?)(?:\s+\d+\s+\d+(?:\.\d*)?)?$')
+
+    def __init__(self, sources, spinner=False, counter=None, threads=1, manifest=None):
         self.spinner = spinner
         self.sources = sources
-        self.FileFilter = FilterCollection()
+        self.counter = counter
+        self.threads = threads
+        self.manifest = manifest
+        self.FileFilter = FilterCollection(cache=True)
         self.PathFilter = FilterCollection()
         assert isinstance(self.sources, list)
+        # Files found so far and the walk in progress
+        self.files = list()
+        self.walker = None
+        self.complete = False
+        # Number of ignored directories pruned from the walk
+        self.pruned = 0
+
+    def list_directory(self, root):
+        """
+        Lists a directory.
+
+        :param str root: The directory to list
+        :returns: The sorted subdirectories to walk, the sorted files to collect and the number of pruned ones
+        :rtype: *tuple*
+
+        """
+        try:
+            entries = list(scandir(root))
+        except OSError:
+            return list(), list(), 0
+        dirs = sorted([entry.path for entry in entries if entry.is_dir()])
+        # Prune ignored subdirectories
+        walked = [d for d in dirs if self.PathFilter(d)]
+        files = list()
+        if self.PathFilter(root):
+            files = sorted([entry.path for entry in entries if entry.is_file() and self.FileFilter(entry.name)])
+        return walked, files, len(dirs) - len(walked)
+
+    def walk_directory(self, source):
+        """
+        Walks through a directory top-down in sorted order following symbolic links (as :func:`os.walk`).
+
+        :param str source: The directory to walk through
+        :returns: The sorted files of each directory
+        :rtype: *iter*
+
+        """
+        stack = [source]
+        while stack:
+            dirs, files, pruned = self.list_directory(stack.pop())
+            stack.extend(reversed(dirs))
+            self.pruned += pruned
+            yield files
+
+    def walk_directory_parallel(self, source, pool):
+        """
+        Walks through a directory listing the subdirectories concurrently.
+        The subdirectories are submitted as soon as their parent is listed so that the whole tree is prefetched,
+        the listings are consumed in the same order as :meth:`walk_directory`.
+
+        :param str source: The directory to walk through
+        :param multiprocessing.pool.ThreadPool pool: The thread pool listing the directories
+        :returns: The sorted files of each directory
+        :rtype: *iter*
+
+        """
+        listings = dict()
+
+        def submit(path):
+            # The callback runs before the listing is ready so that subdirectories are always registered first
+            listings[path] = pool.apply_async(self.list_directory, (path,),
+                                              callback=lambda result: [submit(d) for d in result[0]])
+
+        submit(source)
+        stack = [source]
+        while stack:
+            dirs, files, pruned = listings.pop(stack.pop()).get()
+            stack.extend(reversed(dirs))
+            self.pruned += pruned
+            yield files
+
+    def read_manifest(self):
+        """
+        Reads the files listed in the manifest as a stream.
+        Each line is a file path, optionally followed by both whitespace-separated size and modification time columns
+        (e.g., "lfs find" output), or an ESGF mapfile line. A single trailing number is part of the path.
+        Blank lines and lines starting with "#" are skipped.
+        Relative paths are resolved from the current directory.
+
+        :returns: The filtered files of each batch of lines
+        :rtype: *iter*
+
+        """
+        stream = sys.stdin if self.manifest == '-' else open(self.manifest)
+        try:
+            files = list()
+            # Read line by line: iterating over a pipe in Python 2 waits for a whole read-ahead buffer
+            for i, line in enumerate(iter(stream.readline, ''), 1):
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    path = (self.MAPFILE_LINE.match(line) or self.MANIFEST_LINE.match(line)).group('path')
+                    root, filename = os.path.split(os.path.abspath(path))
+                    if self.PathFilter(root) and self.FileFilter(filename):
+                        files.append(os.path.join(root, filename))
+                if not i % MANIFEST_BATCH_SIZE:
+                    yield files
+                    files = list()
+            yield files
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def walk(self):
+        """
+        Walks through the sources.
+
+        :returns: The sorted files of each directory
+        :rtype: *iter*
+
+        """
+        pool = ThreadPool(self.threads) if self.threads > 1 else None
+        try:
+            for source in self.sources:
+                if os.path.isdir(source):
+                    # If input is a directory: walk through it and yields netCDF files
+                    if pool:
+                        for files in self.walk_directory_parallel(source, pool):
+                            yield files
+                    else:
+                        for files in self.walk_directory(source):
+                            yield files
+                else:
+                    # It input is a file: yields the netCDF file itself
+                    root, filename = os.path.split(source)
+                    if self.PathFilter(root) and self.FileFilter(filename):
+                        yield [source]
+            if self.manifest:
+                for files in self.read_manifest():
+                    yield files
+        finally:
+            # Do not wait for the pool handlers: pending listings are harmless and the threads are daemonic
+            if pool:
+                pool.close()
 
     def __iter__(self):
-        for source in self.sources:
-            if os.path.isdir(source):
-                # If input is a directory: walk through it and yields netCDF files
-                for root, _, filenames in os.walk(source, followlinks=True):
-                    if self.PathFilter(root):
-                        for filename in sorted(filenames):
-                            ffp = os.path.join(root, filename)
-                            if os.path.isfile(ffp) and self.FileFilter(filename):
-                                yield ffp
-            else:
-                # It input is a file: yields the netCDF file itself
-                root, filename = os.path.split(source)
-                if self.PathFilter(root) and self.FileFilter(filename):
-                    yield source
+        i = 0
+        while True:
+            while i < len(self.files):
+                yield self.files[i]
+                i += 1
+            if self.complete:
+                break
+            if self.walker is None:
+                self.walker = self.walk()
+            try:
+                self.files.extend(self.walker.next())
+            except StopIteration:
+                self.walker = None
+                self.complete = True
+            if self.counter is not None:
+                self.counter.value = len(self.files)
 
     def __len__(self):
         """
@@ -80,6 +236,8 @@ class Collector(object):
         :rtype: *int*
 
         """
+        if self.complete:
+            return len(self.files)
         progress = Collecting(self.spinner)
         try:
             s = 0
@@ -106,11 +264,23 @@ class FilterCollection(object):
     The dictionary values are 2-tuples with the regular expression as a string and a boolean
     indicating to match (i.e., include) or non-match (i.e., exclude) the corresponding expression.
 
+    The filters are compiled once into a single-pass engine: the exclusive expressions are merged into one alternation
+    and the inclusive ones into one conjunction of lookaheads. The exclusive side is evaluated first and both sides
+    short-circuit. An expression with flags, groups or backreferences is kept apart to preserve its meaning.
+
+    :param boolean cache: True to record the verdicts (e.g., on filenames repeated across directories)
+    :returns: The filter collection
+    :rtype: *FilterCollection*
+
     """
     FILTER_TYPES = (str, re._pattern_type)
+    # Expressions that cannot be merged without changing their meaning
+    UNMERGEABLE = re.compile(r'\\[1-9]|\(\?P[<=]')
 
-    def __init__(self):
+    def __init__(self, cache=False):
         self.filters = dict()
+        self.engine = None
+        self.verdicts = dict() if cache else None
 
     def add(self, name=None, regex='*', inclusive=True):
         """Add new filter"""
@@ -119,6 +289,69 @@ class FilterCollection(object):
         assert isinstance(regex, self.FILTER_TYPES)
         assert isinstance(inclusive, bool)
         self.filters[name] = (regex, inclusive)
+        # Filters changed: the engine has to be compiled again
+        self.engine = None
+        if self.verdicts is not None:
+            self.verdicts.clear()
+
+    def merge(self, regexes, conjunction=False):
+        """
+        Compiles a list of regular expressions into as few expressions as possible.
+        A string matches a disjunction if it matches any expression and a conjunction if it matches all of them
+        (evaluated as :func:`re.search`).
+
+        :param list regexes: The regular expressions (as strings or compiled)
+        :param boolean conjunction: True to merge into a conjunction, False into a disjunction
+        :returns: The compiled expressions
+        :rtype: *list*
+
+        """
+        compiled = [re.compile(regex) for regex in regexes]
+        mergeable = [c for c in compiled if not c.flags and not self.UNMERGEABLE.search(c.pattern)]
+        if len(mergeable) < 2:
+            return compiled
+        if conjunction:
+            merged = r'\A' + ''.join([r'(?=[\s\S]*?(?:{}))'.format(c.pattern) for c in mergeable])
+        else:
+            merged = '|'.join(['(?:{})'.format(c.pattern) for c in mergeable])
+        try:
+            merged = re.compile(merged)
+        except re.error:
+            return compiled
+        return [merged] + [c for c in compiled if c not in mergeable]
+
+    def compile(self):
+        """
+        Compiles the filters.
+
+        :returns: The exclusive and inclusive compiled expressions
+        :rtype: *tuple*
+
+        """
+        exclusive = [regex for regex, inclusive in self.filters.values() if not inclusive]
+        inclusive = [regex for regex, inclusive in self.filters.values() if inclusive]
+        return self.merge(exclusive), self.merge(inclusive, conjunction=True)
 
     def __call__(self, string):
-        return all([match(regex, string, inclusive=inclusive) for regex, inclusive in self.filters.values()])
+        if self.verdicts is not None:
+            verdict = self.verdicts.get(string)
+            if verdict is not None:
+                return verdict
+        if self.engine is None:
+            self.engine = self.compile()
+        exclusive, inclusive = self.engine
+        verdict = True
+        for regex in exclusive:
+            if regex.search(string):
+                verdict = False
+                break
+        else:
+            for regex in inclusive:
+                if not regex.search(string):
+                    verdict = False
+                    break
+        if self.verdicts is not None:
+            if len(self.verdicts) >= FILTER_CACHE_SIZE:
+                self.verdicts.clear()
+            self.verdicts[string] = verdict
+        return verdict
@@ -140,12 +140,41 @@ TIME_UNITS = {'s': 'seconds',
               'M': 'months',
               'Y': 'years'}
 
+# Number of seconds of the fixed-length time units
+SECONDS_PER_UNIT = {'seconds': 1,
+                    'minutes': 60,
+                    'hours': 3600,
+                    'days': 86400}
+
+# Cumulative number of days at the start of each month for fixed-length year calendars
+MONTH_START_DAYS = {365: [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334, 365],
+                    366: [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335, 366]}
+
+# Julian day of the first day of the Gregorian calendar (i.e., 1582-10-15)
+GREGORIAN_REFORM_JDAY = 2299161
+
+# Number of time steps compared at once between two time axes
+COMPARISON_CHUNK_SIZE = 65536
+
 # Frequencies to consider in case of non-instant time correction
 AVERAGE_CORRECTION_FREQ = ['day', 'mon', 'monPt', 'yr', 'yrPt', '1hrCM', 'sem']
 
 # Climatology frequencies
 CLIMATOLOGY_FREQ = ['monC', 'monClim', '1hrCM']
 
+# Size in bytes of the slabs to stream when copying a netCDF file
+COPY_BUFFER_SIZE = 256 * 1024 ** 2
+
+# Maximum number of filename verdicts cached by a filter collection
+FILTER_CACHE_SIZE = 100000
+
+# Number of manifest lines read before the files are submitted
+MANIFEST_BATCH_SIZE = 64
+
+# Metadata cache filename and lock timeout in seconds
+CACHE_FILENAME = 'nctime.db'
+CACHE_TIMEOUT = 60
+
 # Available CF calendars
 CALENDARS = ['gregorian',
              'standard',
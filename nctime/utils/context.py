@@ -55,14 +55,24 @@ class BaseContext(object):
         else:
             self.file_filter.append(('^\..*$', False))
         self.dir_filter = args.ignore_dir
+        self.walk_threads = args.walk_threads
+        self.manifest = args.from_file
+        # Get metadata cache directory
+        self.cache_dir = os.path.abspath(args.cache_dir) if args.cache_dir else None
         # Init process manager
         if self.use_pool:
             manager = SyncManager()
             manager.start()
             Print.BUFFER = manager.Value(c_char_p, '')
             self.progress = manager.Value('i', 0)
+            self.nbfound = manager.Value('i', 0)
+            self.cache_hits = manager.Value('i', 0)
+            self.cache_misses = manager.Value('i', 0)
         else:
             self.progress = Value('i', 0)
+            self.nbfound = Value('i', 0)
+            self.cache_hits = Value('i', 0)
+            self.cache_misses = Value('i', 0)
         self.tunits_default = None
         if self.project in DEFAULT_TIME_UNITS.keys():
             self.tunits_default = DEFAULT_TIME_UNITS[self.project]
@@ -117,6 +127,11 @@ class BaseContext(object):
             msg += COLORS.FAIL(m)
         else:
             msg += COLORS.SUCCESS(m)
+        if self.cache_dir:
+            msg += COLORS.OKBLUE('\nNumber of cache hit(s): {}'.format(self.cache_hits.value))
+            msg += COLORS.OKBLUE('\nNumber of cache miss(es): {}'.format(self.cache_misses.value))
+        if self.sources.pruned:
+            msg += COLORS.OKBLUE('\nNumber of ignored director(y|ies) pruned: {}'.format(self.sources.pruned))
         # Print summary
         Print.summary(msg)
         # Print log path if exists
@@ -86,6 +86,14 @@ Unix wildcards are allowed.
 
 """
 
+FROM_FILE_HELP = """Reads the files to diagnose from a manifest instead of walking directories.
+Use "-" to read the standard input. One file per line, optionally followed by both
+whitespace-separated size and modification time columns (e.g., "lfs find" output).
+ESGF mapfiles are also accepted. The files are processed as the manifest is read
+and are filtered as usual (see "--include-file", "--exclude-file" and "--ignore-dir").
+
+"""
+
 DIRECTORY_HELP = """One or more variable directories to diagnose.
 Unix wildcards are allowed.
 
@@ -101,6 +109,18 @@ THIS ACTION DEFINITELY MODIFY INPUT FILES!
 
 """
 
+PLAN_HELP = """Writes the overlap resolution plan into a JSON file without modifying input files.
+The plan lists the files to delete and the files to truncate with their cutting timestep.
+Use "--full-only" to only plan the deletion of full overlapping files.
+
+"""
+
+APPLY_PLAN_HELP = """Applies a resolution plan previously written with "--plan".
+The datasets are resolved in parallel (see "--max-processes"). No directory is scanned.
+THIS ACTION DEFINITELY MODIFY INPUT FILES!
+
+"""
+
 ON_FLY_HELP = """Ignore the test on end date consistency for on going simulation (this also include completed files).
 
 """
@@ -140,6 +160,18 @@ Default is set to 5. If submitted without value, all timesteps are printed.
 
 """
 
+BLOCK_SIZE_HELP = """Number of time steps to read, rebuild, check and rewrite at once.
+Bounds the memory usage whatever the time axis length (e.g., for long sub-daily time series).
+Default is to process the whole time axis at once.
+
+"""
+
+MAX_MEMORY_HELP = """Memory budget per process in MB for the time axis checking.
+The number of time steps processed at once is deduced from this budget.
+Default is to process the whole time axis at once.
+
+"""
+
 IGNORE_ERROR_HELP = """One or several error codes to ignore comma-separated.
 
 """
@@ -154,6 +186,26 @@ THIS ACTION DEFINITELY MODIFY INPUT FILES!
 
 """
 
+HEADER_FREE_HELP = """Deduces the MIP table and the frequency from the filename facets if possible.
+Otherwise only the first file of each dataset is opened to read them.
+Default is to read them from each file.
+
+"""
+
+GRAPH_BACKEND_HELP = """Backend used to find the shortest path within the directed graph of each dataset.
+"numpy" sweeps the files sorted by dates without building all the edges.
+"networkx" uses the reference shortest path method from networkx library.
+Both backends choose the same files among equivalent paths.
+Default is "numpy".
+
+"""
+
+CACHE_DIR_HELP = """Directory of the metadata cache shared by nctxck and nctcck.
+Unchanged files since a previous run are not reopened when possible.
+Default is to not use any cache.
+
+"""
+
 MAX_PROCESSES_HELP = """Number of maximal processes to simultaneously treat several files. Max is the CPU count.
 Set to 1 seems sequential processing.
 Set to -1 uses the max CPU count.
@@ -161,8 +213,16 @@ Default is set to 4 processes.
 
 """
 
+WALK_THREADS_HELP = """Number of threads to simultaneously list the directories to scan.
+Listings overlap the metadata latency of shared or parallel filesystems (e.g., NFS, Lustre, GPFS).
+Files are collected in the same sorted order whatever the number of threads.
+Default is set to 1 thread (i.e., sequential walk).
+
+"""
+
 IGNORE_DIR_HELP = """Filter directories NON-matching the regular expression.
 Default ignore paths with folder name(s) starting with "." pattern.
+An ignored directory is pruned from the scan: its whole subtree is skipped.
 (Regular expression must match from start of path; prefix with ".*" if required.)
 
 """
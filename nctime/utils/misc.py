@@ -7,9 +7,15 @@
 
 """
 
+import os
+import shutil
+from tempfile import mkstemp
+
+import numpy as np
 from fuzzywuzzy import fuzz, process
 from netCDF4 import Dataset
 
+from constants import COPY_BUFFER_SIZE
 from custom_exceptions import *
 from custom_print import *
 
@@ -40,24 +46,202 @@ class ncopen(object):
         self.nc.close()
 
 
-def match(pattern, string, inclusive=True):
+class NetCDFHeader(object):
+    """
+    Snapshot of the netCDF header and time axis, read within a single file opening.
+    The record can be queried as many times as required without reopening the file.
+
+     * The global attributes,
+     * The time variable attributes, length, first and last values,
+     * The time boundaries variable name (from "bounds" or "climatology" attribute),
+     * The cell methods of the submitted variable,
+     * The raw time axis and time boundaries (only if data is True).
+
+    :param str ffp: The netCDF file full path
+    :param str variable: The variable from which to get the cell methods
+    :param boolean data: True to also load the time axis and time boundaries values
+    :returns: The netCDF header snapshot
+    :rtype: *NetCDFHeader*
+
+    """
+
+    def __init__(self, ffp, variable=None, data=True):
+        self.ffp = ffp
+        self.variable = variable
+        self.time_attrs = None
+        self.variable_attrs = None
+        self.length = None
+        self.time_first = None
+        self.time_last = None
+        self.tbnds = None
+        self.cell_methods = None
+        self.time = None
+        self.bounds = None
+        with ncopen(self.ffp) as nc:
+            # Get global attributes
+            self.global_attrs = nc.__dict__
+            self.variables = nc.variables.keys()
+            # Get time properties
+            if 'time' in self.variables:
+                self.time_attrs = nc.variables['time'].__dict__
+                self.length = nc.variables['time'].shape[0]
+                if self.length:
+                    self.time_first = nc.variables['time'][0]
+                    self.time_last = nc.variables['time'][-1]
+                if 'bounds' in self.time_attrs:
+                    self.tbnds = self.time_attrs['bounds']
+                if 'climatology' in self.time_attrs:
+                    self.tbnds = self.time_attrs['climatology']
+                if self.tbnds and self.tbnds not in self.variables:
+                    raise NoNetCDFVariable(self.tbnds, self.ffp)
+                if data:
+                    self.time = nc.variables['time'][:]
+                    if self.tbnds:
+                        self.bounds = nc.variables[self.tbnds][:, :]
+            # Get cell methods of the variable
+            if self.variable:
+                if self.variable not in self.variables:
+                    raise NoNetCDFVariable(self.variable, self.ffp)
+                self.variable_attrs = nc.variables[self.variable].__dict__
+                if 'cell_methods' in self.variable_attrs:
+                    self.cell_methods = self.variable_attrs['cell_methods']
+
+    def get_att(self, attribute, variable=None):
+        """
+        Get attribute from the snapshot. Default is to find into global attributes.
+        If attribute key is not found, get the closest key name instead.
+
+        :param str attribute: The attribute key to get
+        :param str variable: The variable from which to find the attribute. Global is None.
+        :return: The attribute value
+        :rtype: *str*
+
+        """
+        if variable and variable == 'time':
+            attrs = self.time_attrs or dict()
+        elif variable and variable == self.variable:
+            attrs = self.variable_attrs
+        elif variable:
+            raise NoNetCDFVariable(variable, self.ffp)
+        else:
+            attrs = self.global_attrs
+        if attribute in attrs.keys():
+            return attrs[attribute]
+        else:
+            try:
+                key, score = process.extractOne(attribute, attrs.keys(), scorer=fuzz.partial_ratio)
+            except:
+                raise NoNetCDFAttribute(attribute, self.ffp, variable)
+            if score >= 80:
+                Print.warning('Consider "{}" attribute instead of "{}"'.format(key, attribute))
+                return attrs[key]
+            else:
+                raise NoNetCDFAttribute(attribute, self.ffp, variable)
+
+
+def nc_used_dimensions(group, exclude):
+    """
+    Gets the dimensions used by the variables of a netCDF group and its subgroups, except the excluded variables.
+    Each dimension is resolved through the group hierarchy up to the group defining it.
+
+    :param netCDF4.Group group: The group to walk through
+    :param list exclude: The variable names to exclude
+    :returns: The used dimensions as (group path, dimension name)
+    :rtype: *set*
+
+    """
+    dimensions = set([(dim.group().path, dim.name)
+                      for name, var in group.variables.items() if name not in exclude
+                      for dim in var.get_dims()])
+    for subgroup in group.groups.values():
+        dimensions.update(nc_used_dimensions(subgroup, exclude))
+    return dimensions
+
+
+def nccopy_group(src, dst, exclude, buffer_size=COPY_BUFFER_SIZE, dimensions=None):
+    """
+    Copies a netCDF group into another, except the excluded variables.
+    Dimensions only used by excluded variables are dropped.
+    A dimension used by the variables of a subgroup is kept in the parent group defining it.
+    Each variable keeps its attributes, chunking, compression and endianness.
+    Data are streamed as raw values by slabs along the first dimension.
+
+    :param netCDF4.Group src: The group to copy
+    :param netCDF4.Group dst: The group to fill
+    :param list exclude: The variable names to exclude
+    :param int buffer_size: The maximum size in bytes of a slab
+    :param set dimensions: The used dimensions of the whole file, as (group path, dimension name)
+    :returns: The number of data bytes moved
+    :rtype: *int*
+
+    """
+    moved = 0
+    if dimensions is None:
+        dimensions = nc_used_dimensions(src, exclude)
+    dst.setncatts(src.__dict__)
+    variables = [var for name, var in src.variables.items() if name not in exclude]
+    for name, dim in src.dimensions.items():
+        if (src.path, name) in dimensions:
+            dst.createDimension(name, None if dim.isunlimited() else len(dim))
+    for var in variables:
+        kwargs = dict(endian=var.endian())
+        filters = var.filters()
+        if filters:
+            kwargs.update(filters)
+        chunking = var.chunking()
+        if chunking == 'contiguous':
+            kwargs['contiguous'] = True
+        elif chunking:
+            kwargs['chunksizes'] = chunking
+        if '_FillValue' in var.ncattrs():
+            kwargs['fill_value'] = var.getncattr('_FillValue')
+        new = dst.createVariable(var.name, var.datatype, var.dimensions, **kwargs)
+        new.setncatts(dict((k, v) for k, v in var.__dict__.items() if k != '_FillValue'))
+        # Copy raw values
+        var.set_auto_maskandscale(False)
+        new.set_auto_maskandscale(False)
+        if not var.dimensions:
+            new.assignValue(var.getValue())
+            continue
+        length = var.shape[0]
+        row_size = int(np.prod(var.shape[1:])) * np.dtype(var.dtype).itemsize
+        rows = max(1, buffer_size // max(1, row_size))
+        for start in xrange(0, length, rows):
+            data = var[start:start + rows]
+            new[start:start + len(data)] = data
+            moved += data.nbytes
+    for name, group in src.groups.items():
+        moved += nccopy_group(group, dst.createGroup(name), exclude, buffer_size, dimensions)
+    return moved
+
+
+def nc_remove_variables(ffp, variables, buffer_size=COPY_BUFFER_SIZE):
     """
-    Validates a string against a regular expression.
-    Only match at the beginning of the string.
-    Default is to match inclusive regex.
+    Removes variables from a netCDF file without external operators.
+    The file is streamed into a temporary copy within the same directory which replaces the original file.
 
-    :param str pattern: The regular expression to match
-    :param str string: The string to test
-    :param boolean inclusive: False if negative matching (i.e., exclude the regex)
-    :returns: True if it matches
-    :rtype: *boolean*
+    :param str ffp: The netCDF file full path
+    :param list variables: The variable names to remove
+    :param int buffer_size: The maximum size in bytes of a slab to copy at once
+    :returns: The number of data bytes moved
+    :rtype: *int*
 
     """
-    # Assert inclusive and exclusive flag are mutually exclusive
-    if inclusive:
-        return True if re.search(pattern, string) else False
-    else:
-        return True if not re.search(pattern, string) else False
+    fd, tmp = mkstemp(prefix='.', suffix='.nc', dir=os.path.dirname(ffp))
+    os.close(fd)
+    try:
+        with ncopen(ffp) as src:
+            dst = Dataset(tmp, 'w', format=src.data_model)
+            try:
+                moved = nccopy_group(src, dst, variables, buffer_size)
+            finally:
+                dst.close()
+        shutil.copymode(ffp, tmp)
+        os.rename(tmp, ffp)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return moved
 
 
 def get_project(ffp):
@@ -235,6 +235,39 @@ def processes_validator(value):
         return pnum
 
 
+def manifest_validator(path):
+    """
+    Validates the manifest path. "-" reads the standard input.
+
+    :param str path: The manifest path submitted
+    :returns: The normalized manifest path
+    :rtype: *str*
+    :raises Error: If the manifest does not exist
+
+    """
+    if path == '-':
+        return path
+    path = os.path.abspath(os.path.normpath(path))
+    if not os.path.isfile(path):
+        msg = 'No such manifest: {}'.format(path)
+        raise ArgumentTypeError(msg)
+    return path
+
+
+def threads_validator(value):
+    """
+    Validates the walking threads number.
+
+    :param str value: The threads number submitted
+    :return:
+    """
+    tnum = int(value)
+    if tnum < 1:
+        msg = 'Invalid threads number. Should be a strictly positive integer.'
+        raise ArgumentTypeError(msg)
+    return tnum
+
+
 def inc_converter(string):
     """
     Checks the increment value syntax.
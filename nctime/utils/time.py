@@ -7,14 +7,21 @@
 
 """
 
+import re
+from bisect import bisect_left
+
 import netCDF4
 import numpy as np
-from netcdftime import utime, datetime
+from netcdftime import datetime
 
+from constants import SECONDS_PER_UNIT, MONTH_START_DAYS, GREGORIAN_REFORM_JDAY, COMPARISON_CHUNK_SIZE
 from custom_exceptions import *
 from custom_print import *
 from misc import ncopen
 
+# Per-process memoized tables of days since reference date at each month or year start
+CALENDAR_OFFSETS = dict()
+
 
 class TimeInit(object):
     """
@@ -126,6 +133,42 @@ def truncated_timestamp(date, length):
     return timestamp[:length]
 
 
+def calendar_offsets(units, calendar, first, last):
+    """
+    Returns the number of days since the reference date at the start of each month (or year) between
+    the first and the last index following "months since" (or "years since") units.
+    The table is memoized per process and per (units, calendar) pair, and grown on demand,
+    so that files of the same dataset share the same table.
+
+    :param str units: The proper time units (i.e., "months since" or "years since")
+    :param str calendar: The NetCDF calendar attribute
+    :param int first: The first month (or year) index
+    :param int last: The last month (or year) index (included)
+    :returns: The number of days since the reference date of each month (or year) start
+    :rtype: *numpy.array*
+
+    """
+    first, last = int(first), int(last)
+    start, table = CALENDAR_OFFSETS.get((units, calendar), (first, np.empty(0, dtype=np.int64)))
+    end = start + len(table)
+    if first < start or last >= end:
+        # Grow the table by at least its current size to amortize the successive extensions
+        if first < start:
+            start = min(first, start - len(table))
+        if last >= end:
+            end = max(last + 1, end + len(table))
+        name, origin = time_units_origin(units)
+        index = np.arange(start, end, dtype=np.int64)
+        if name == 'years':
+            year, month = origin[0] + index, origin[1]
+        else:
+            month = origin[1] - 1 + index
+            year, month = origin[0] + month // 12, month % 12 + 1
+        table = date2days(year, month, origin[2], calendar) - date2days(*origin[:3], calendar=calendar)
+        CALENDAR_OFFSETS[(units, calendar)] = (start, table)
+    return table[first - start:last + 1 - start]
+
+
 def num2date(num_axis, units, calendar):
     """
     A wrapper from ``netCDF4.num2date`` able to handle "years since" and "months since" units.
@@ -144,52 +187,21 @@ def num2date(num_axis, units, calendar):
     else:
         # Return to time reference with 'days since'
         units_as_days = 'days ' + ' '.join(units.split(' ')[1:])
-        # Convert the time reference 'units_as_days' as datetime object
-        start_date = netCDF4.num2date(0.0, units=units_as_days, calendar=calendar)
         # Control num_axis to always get an Numpy array (even with a scalar)
         num_axis_mod = np.atleast_1d(np.array(num_axis))
-        if units.split(' ')[0] == 'years':
-            # If units are 'years since'
-            # Define the number of maximum and minimum years to build a date axis covering
-            # the whole 'num_axis' period
-            max_years = np.floor(np.max(num_axis_mod)) + 1
-            min_years = np.ceil(np.min(num_axis_mod)) - 1
-            # Create a date axis with one year that spans the entire period by year
-            years_axis = np.array([add_year(start_date, years_to_add)
-                                   for years_to_add in np.arange(min_years, max_years + 2)])
-            # Convert rebuilt years axis as 'number of days since'
-            cdftime = utime(units_as_days, calendar=calendar)
-            years_axis_as_days = cdftime.date2num(years_axis)
-            # Index of each years
-            yind = np.vectorize(np.int)(np.floor(num_axis_mod))
-            # Rebuilt num_axis as 'days since' adding the number of days since referenced time
-            # with an half-increment (num_axis_mod - yind) = 0 or 0.5
-            num_axis_mod_days = (years_axis_as_days[yind - int(min_years)] +
-                                 (num_axis_mod - yind) *
-                                 np.diff(years_axis_as_days)[yind - int(min_years)])
-            # Convert result as date axis
-            return netCDF4.num2date(num_axis_mod_days, units=units_as_days, calendar=calendar)
-        elif units.split(' ')[0] == 'months':
-            # If units are 'months since'
-            # Define the number of maximum and minimum months to build a date axis covering
-            # the whole 'num_axis' period
-            max_months = np.floor(np.max(num_axis_mod)) + 1
-            min_months = np.ceil(np.min(num_axis_mod)) - 1
-            # Create a date axis with one month that spans the entire period by month
-            months_axis = np.array([add_month(start_date, months_to_add)
-                                    for months_to_add in np.arange(min_months, max_months + 12)])
-            # Convert rebuilt months axis as 'number of days since'
-            cdftime = utime(units_as_days, calendar=calendar)
-            months_axis_as_days = cdftime.date2num(months_axis)
-            # Index of each months
-            mind = np.vectorize(np.int)(np.floor(num_axis_mod))
-            # Rebuilt num_axis as 'days since' adding the number of days since referenced time
-            # with an half-increment (num_axis_mod - mind) = 0 or 0.5
-            num_axis_mod_days = (months_axis_as_days[mind - int(min_months)] +
-                                 (num_axis_mod - mind) *
-                                 np.diff(months_axis_as_days)[mind - int(min_months)])
-            # Convert result as date axis
-            return netCDF4.num2date(num_axis_mod_days, units=units_as_days, calendar=calendar)
+        # Index of each years or months
+        ind = np.floor(num_axis_mod).astype(np.int64)
+        # Get the number of days since referenced time of each year or month start
+        # covering the whole 'num_axis' period
+        first = np.min(ind)
+        axis_as_days = calendar_offsets(units, calendar, first, np.max(ind) + 1)
+        # Rebuilt num_axis as 'days since' adding the number of days since referenced time
+        # with an half-increment (num_axis_mod - ind) = 0 or 0.5
+        num_axis_mod_days = (axis_as_days[ind - first] +
+                             (num_axis_mod - ind) *
+                             np.diff(axis_as_days)[ind - first])
+        # Convert result as date axis
+        return netCDF4.num2date(num_axis_mod_days, units=units_as_days, calendar=calendar)
 
 
 def date2num(date_axis, units, calendar):
@@ -213,48 +225,45 @@ def date2num(date_axis, units, calendar):
         units_as_days = 'days ' + ' '.join(units.split(' ')[1:])
         # Convert date axis as number of days since time reference
         days_axis = netCDF4.date2num(date_axis, units=units_as_days, calendar=calendar)
-        # Convert the time reference 'units_as_days' as datetime object
-        start_date = netCDF4.num2date(0.0, units=units_as_days, calendar=calendar)
-        # Create years axis from input date axis
-        years = np.array([date.year for date in np.atleast_1d(np.array(date_axis))])
-        if units.split(' ')[0] == 'years':
-            # If units are 'years since'
-            # Define the number of maximum and minimum years to build a date axis covering
-            # the whole 'num_axis' period
-            max_years = np.max(years - start_date.year + 1)
-            min_years = np.min(years - start_date.year - 1)
-            # Create a date axis with one year that spans the entire period by year
-            years_axis = np.array([add_year(start_date, yid)
-                                   for yid in np.arange(min_years, max_years + 2)])
-            # Convert years axis as number of days since time reference
-            cdftime = utime(units_as_days, calendar=calendar)
-            years_axis_as_days = cdftime.date2num(years_axis)
-            # Find closest index for years_axis_as_days in days_axis
-            closest_index = np.searchsorted(years_axis_as_days, days_axis)
-            # Compute the difference between closest value of year axis and start date, in number of days
-            num = days_axis - years_axis_as_days[closest_index]
-            # Number of days of the corresponding closest year
-            den = np.diff(years_axis_as_days)[closest_index]
-            return np.around(min_years + closest_index + num / den, 10)
-        elif units.split(' ')[0] == 'months':
-            # If units are 'months since'
-            # Define the number of maximum and minimum months to build a date axis covering
-            # the whole 'num_axis' period
-            max_months = np.max(12 * (years - start_date.year + 12))
-            min_months = np.min(12 * (years - start_date.year - 12))
-            # Create a date axis with one month that spans the entire period by month
-            months_axis = np.array([add_month(start_date, mid)
-                                    for mid in np.arange(min_months, max_months)])
-            # Convert months axis as number of days since time reference
-            cdftime = utime(units_as_days, calendar=calendar)
-            months_axis_as_days = cdftime.date2num(months_axis)
-            # Find closest index for months_axis_as_days in days_axis
-            closest_index = np.searchsorted(months_axis_as_days, days_axis)
-            # Compute the difference between closest value of months axis and start date, in number of days
-            num = days_axis - months_axis_as_days[closest_index]
-            # Number of days of the corresponding closest month
-            den = np.diff(months_axis_as_days)[closest_index]
-            return np.around(min_months + closest_index + num / den, 10)
+        # Define the number of minimum and maximum years or months covering the whole 'days_axis' period
+        # from the shortest and longest lengths of a year or a month in any calendar
+        shortest, longest = (359., 367.) if units.split(' ')[0] == 'years' else (27., 32.)
+        bounds = np.array([np.min(days_axis), np.max(days_axis)])
+        first = int(np.floor(np.min([bounds / shortest, bounds / longest]))) - 1
+        last = int(np.ceil(np.max([bounds / shortest, bounds / longest]))) + 2
+        # Get the number of days since referenced time of each year or month start
+        axis_as_days = calendar_offsets(units, calendar, first, last)
+        # Find closest index for axis_as_days in days_axis
+        closest_index = np.searchsorted(axis_as_days, days_axis)
+        # Compute the difference between closest value of the axis and start date, in number of days
+        num = days_axis - axis_as_days[closest_index]
+        # Number of days of the corresponding closest year or month
+        den = np.diff(axis_as_days)[closest_index]
+        return np.around(first + closest_index + num / den, 10)
+
+
+def num2num(num_axis, units, new_units, calendar):
+    """
+    Converts a numerical time axis from units into new units.
+    If both units are fixed-length units (i.e., seconds, minutes, hours or days since) sharing the same
+    reference date, the conversion is a plain scaling of the axis and no date is built.
+    Otherwise, calls :func:`num2date` and :func:`date2num` successively.
+
+    :param numpy.array num_axis: The numerical time axis following units
+    :param str units: The proper time units
+    :param str new_units: The time units to convert the axis into
+    :param str calendar: The NetCDF calendar attribute
+    :returns: The corresponding numerical time axis following new units
+    :rtype: *numpy.array*
+
+    """
+    name, origin = time_units_origin(units)
+    new_name, new_origin = time_units_origin(new_units)
+    if name in SECONDS_PER_UNIT and new_name in SECONDS_PER_UNIT and origin == new_origin:
+        # Scale through seconds to keep exact values for integer number of seconds
+        return np.asarray(num_axis, dtype=np.float64) * SECONDS_PER_UNIT[name] / SECONDS_PER_UNIT[new_name]
+    else:
+        return date2num(num2date(num_axis, units=units, calendar=calendar), units=new_units, calendar=calendar)
 
 
 def add_month(date, months_to_add):
@@ -353,12 +362,18 @@ def get_last_timestep(ffp):
         return nc.variables['time'][-1]
 
 
-def get_next_timestep(ffp, current_timestep):
+def get_next_timestep(ffp, current_timestep, first_step=None, last_step=None, length=None):
     """
     Returns next time step from time axis given the current one.
+    If the time axis endpoints are known, the current time step index is first guessed assuming a regular time axis.
+    Otherwise, the current time step is located by binary search. Only the probed values are read.
+    The whole time axis is scanned if the current time step is not found (e.g., non-monotonic time axis).
 
     :param str ffp: The file full path
     :param int current_timestep: The current_timestep
+    :param float first_step: The first time step if already known
+    :param float last_step: The last time step if already known
+    :param int length: The time axis length if already known
     :returns: The next timestep
     :rtype: *int*
 
@@ -366,8 +381,23 @@ def get_next_timestep(ffp, current_timestep):
     with ncopen(ffp) as nc:
         if 'time' not in nc.variables.keys():
             raise NoNetCDFVariable('time', ffp)
-        else:
-            time = nc.variables['time'][:]
+        time = nc.variables['time']
+        if length is None:
+            length = time.shape[0]
+        for timestep in [current_timestep, int(current_timestep)]:
+            # Guess index from a regular time axis
+            if first_step is not None and last_step is not None and last_step > first_step:
+                index = int(round((timestep - first_step) * (length - 1) / (last_step - first_step)))
+                if 0 <= index < length - 1:
+                    steps = time[index:index + 2]
+                    if steps[0] == timestep:
+                        return steps[1]
+            # Binary search
+            index = bisect_left(time, timestep, 0, length)
+            if index < length and time[index] == timestep:
+                return time[index + 1]
+        # Rollback on full time axis scan
+        time = time[:]
         try:
             index = int(np.where(time == current_timestep)[0][0])
         except IndexError:
@@ -394,6 +424,53 @@ def trunc(array, ndecimals):
     return np.trunc(array * decade) / decade
 
 
+def ticks(array, ndecimals):
+    """
+    Converts each item of a Numpy array into exact integer ticks at the decimal ndecimals.
+    Two items are equal once truncated with :func:`trunc` if and only if they have the same ticks.
+
+    :param numpy.array array: The array to convert
+    :param int ndecimals: Number of decimals to keep
+    :returns: The integer ticks
+    :rtype: *numpy.array*
+
+    """
+    return np.trunc(np.asarray(array, dtype=np.float64) * 10 ** ndecimals).astype(np.int64)
+
+
+def compare_axes(axis, reference, ndecimals, limit=None, exhaustive=False):
+    """
+    Compares a numerical time axis (or [n, 2] time boundaries) with a reference as exact integer ticks
+    at the decimal ndecimals. Both axes are compared chunk by chunk without truncated copies.
+    The comparison stops as soon as the first mismatching indices are found, unless exhaustive.
+
+    :param numpy.array axis: The time axis to check
+    :param numpy.array reference: The reference time axis with the same shape
+    :param int ndecimals: Number of decimals to keep
+    :param int limit: The number of mismatching indices to return, default is all of them
+    :param boolean exhaustive: True to count all the mismatches, even if the limit is reached
+    :returns: True if both axes match, the number of mismatches found and the first mismatching indices
+    :rtype: *tuple*
+
+    """
+    count, indices = 0, list()
+    for start in xrange(0, len(axis), COMPARISON_CHUNK_SIZE):
+        stop = start + COMPARISON_CHUNK_SIZE
+        diff = ticks(axis[start:stop], ndecimals) != ticks(reference[start:stop], ndecimals)
+        if diff.ndim > 1:
+            # A time step is wrong if one of its boundaries is wrong
+            diff = np.any(diff, axis=1)
+        wrong = np.flatnonzero(diff)
+        count += len(wrong)
+        if limit:
+            indices.extend(start + wrong[:limit - len(indices)])
+            if len(indices) >= limit and not exhaustive:
+                break
+        else:
+            indices.extend(start + wrong)
+    return count == 0, count, indices
+
+
 def time_inc(table, frequency):
     """
     Returns the time incrementation and time units depending on the MIP frequency and table.
@@ -421,7 +498,7 @@ def dates2int(dates):
 
     """
     if isinstance(dates, list) or isinstance(dates, np.ndarray):
-        return map(int, dates2str(dates, iso_format=False))
+        return components2int(date2components(dates)).tolist()
     else:
         return int(dates2str(dates, iso_format=False))
 
@@ -437,7 +514,7 @@ def dates2str(dates, iso_format=True):
 
     """
     if isinstance(dates, list) or isinstance(dates, np.ndarray):
-        return [date2str(date, iso_format) for date in dates]
+        return components2str(date2components(dates), iso_format).tolist()
     else:
         return date2str(dates, iso_format)
 
@@ -498,3 +575,253 @@ def str2date(string, iso_format=True):
         return dt.strptime(string, "%Y-%m-%dT%H:%M:%S")
     else:
         return dt.strptime(string, "%Y%m%d%H%M%S")
+
+
+def time_units_origin(units):
+    """
+    Splits time units into the units name and the components of the reference date.
+
+    :param str units: The time units (e.g., "days since 1850-01-01 00:00:00")
+    :returns: The units name and the reference date as (year, month, day, hour, minute, second)
+    :rtype: *tuple*
+    :raises Error: If the time units format is invalid
+
+    """
+    match = re.match(r'^\s*(\w+)\s+since\s+(-?\d+)-(\d+)-(\d+)(?:[\sT]+(\d+):(\d+)(?::(\d+(?:\.\d*)?))?)?', units)
+    if not match:
+        raise InvalidUnits(units)
+    name, year, month, day, hour, minute, second = match.groups()
+    origin = (int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(float(second or 0)))
+    return name, origin
+
+
+def date2days(year, month, day, calendar):
+    """
+    Converts date components into day numbers, depending on the calendar.
+    Day numbers are Julian days for real-world calendars and a plain count of days for
+    the fixed-length year calendars. Only differences between day numbers are meaningful.
+    As in ``netcdftime``, there is no year 0 in real-world calendars (i.e., year -1 precedes year 1).
+
+    :param numpy.array year: The years
+    :param numpy.array month: The months
+    :param numpy.array day: The days
+    :param str calendar: The NetCDF calendar attribute
+    :returns: The corresponding day numbers
+    :rtype: *numpy.array*
+    :raises Error: If the calendar is not supported
+
+    """
+    year, month, day = [np.asarray(x, dtype=np.int64) for x in (year, month, day)]
+    if calendar == '360_day':
+        return year * 360 + (month - 1) * 30 + day - 1
+    elif calendar in ['noleap', '365_day']:
+        return year * 365 + np.take(MONTH_START_DAYS[365], month - 1) + day - 1
+    elif calendar in ['all_leap', '366_day']:
+        return year * 366 + np.take(MONTH_START_DAYS[366], month - 1) + day - 1
+    elif calendar in ['julian', 'proleptic_gregorian', 'gregorian', 'standard']:
+        # Count years from year 0 (i.e., the year before year 1)
+        year = np.where(year < 0, year + 1, year)
+        # Shift the year to start in March to put leap day at the end
+        a = (14 - month) // 12
+        y = year + 4800 - a
+        m = month + 12 * a - 3
+        julian = day + (153 * m + 2) // 5 + 365 * y + y // 4 - 32083
+        gregorian = julian - y // 100 + y // 400 + 38
+        if calendar == 'julian':
+            return julian
+        elif calendar == 'proleptic_gregorian':
+            return gregorian
+        else:
+            return np.where(gregorian >= GREGORIAN_REFORM_JDAY, gregorian, julian)
+    else:
+        raise ValueError('Unsupported calendar: {}'.format(calendar))
+
+
+def days2date(days, calendar):
+    """
+    Converts day numbers into date components, depending on the calendar.
+    This is the reverse of :func:`date2days`.
+
+    :param numpy.array days: The day numbers
+    :param str calendar: The NetCDF calendar attribute
+    :returns: The years, months and days
+    :rtype: *tuple*
+    :raises Error: If the calendar is not supported
+
+    """
+    days = np.asarray(days, dtype=np.int64)
+    if calendar == '360_day':
+        year, doy = days // 360, days % 360
+        return year, doy // 30 + 1, doy % 30 + 1
+    elif calendar in ['noleap', '365_day', 'all_leap', '366_day']:
+        ndays = 365 if calendar in ['noleap', '365_day'] else 366
+        year, doy = days // ndays, days % ndays
+        month = np.searchsorted(MONTH_START_DAYS[ndays], doy, side='right')
+        return year, month, doy - np.take(MONTH_START_DAYS[ndays], month - 1) + 1
+    elif calendar in ['julian', 'proleptic_gregorian', 'gregorian', 'standard']:
+        # Count centuries only with Gregorian leap year rules
+        a = days + 32044
+        b = (4 * a + 3) // 146097
+        if calendar == 'julian':
+            b, c = np.zeros_like(days), days + 32082
+        elif calendar == 'proleptic_gregorian':
+            c = a - 146097 * b // 4
+        else:
+            is_gregorian = (days >= GREGORIAN_REFORM_JDAY)
+            b = np.where(is_gregorian, b, 0)
+            c = np.where(is_gregorian, a - 146097 * b // 4, days + 32082)
+        d = (4 * c + 3) // 1461
+        e = c - 1461 * d // 4
+        m = (5 * e + 2) // 153
+        year = 100 * b + d - 4800 + m // 10
+        return np.where(year <= 0, year - 1, year), m + 3 - 12 * (m // 10), e - (153 * m + 2) // 5 + 1
+    else:
+        raise ValueError('Unsupported calendar: {}'.format(calendar))
+
+
+def num2components(num_axis, units, calendar):
+    """
+    Converts a numerical time axis into date components without building any datetime object.
+    Seconds are truncated as in :func:`date2str` (i.e., after rounding the time axis to the millisecond).
+
+    :param numpy.array num_axis: The numerical time axis following units
+    :param str units: The proper time units
+    :param str calendar: The NetCDF calendar attribute
+    :returns: The years, months, days, hours, minutes and seconds with the same shape as the time axis
+    :rtype: *tuple*
+
+    """
+    name, origin = time_units_origin(units)
+    if name not in SECONDS_PER_UNIT:
+        # "months since" or "years since" units
+        dates = num2date(np.atleast_1d(num_axis), units=units, calendar=calendar)
+        return tuple(c.reshape(np.shape(num_axis)) for c in date2components(dates))
+    num_axis = np.asarray(num_axis, dtype=np.float64)
+    seconds = np.floor(np.around(num_axis * SECONDS_PER_UNIT[name], 3)).astype(np.int64)
+    seconds += origin[3] * 3600 + origin[4] * 60 + origin[5]
+    year, month, day = days2date(date2days(*origin[:3], calendar=calendar) + seconds // 86400, calendar)
+    seconds %= 86400
+    return year, month, day, seconds // 3600, seconds % 3600 // 60, seconds % 60
+
+
+def date2components(dates):
+    """
+    Extracts date components from (a list of) datetime or phony datetime objects.
+
+    :param list dates: A list of datetime or phony datetime objects
+    :returns: The years, months, days, hours, minutes and seconds
+    :rtype: *tuple*
+
+    """
+    components = np.array([(date.year, date.month, date.day, date.hour, date.minute, date.second)
+                           for date in np.ravel(dates)], dtype=np.int64).reshape(-1, 6)
+    return tuple(components.T)
+
+
+def components2str(components, iso_format=True):
+    """
+    Converts date components in format: %Y%m%d %H:%M:%s, all at once.
+    Each component is written as fixed-width ASCII digits and the characters are viewed as strings.
+    Years out of the [0, 9999] range are signed or wider and are formatted apart, as in :func:`date2str`.
+
+    :param tuple components: The years, months, days, hours, minutes and seconds (as integer arrays)
+    :param boolean iso_format: ISO format date if True
+    :returns: The corresponding formatted strings
+    :rtype: *numpy.array*
+
+    """
+    components = [np.asarray(c, dtype=np.int64) for c in components]
+    separators = ['-', '-', 'T', ':', ':'] if iso_format else [''] * 5
+    year, shape = components[0], components[0].shape
+    is_fixed_year = np.all((year >= 0) & (year <= 9999))
+    chars = list()
+    for component, width, separator in zip(components, [4, 2, 2, 2, 2, 2], [''] + separators):
+        if separator:
+            chars.append(np.full(shape + (1,), ord(separator), dtype=np.uint8))
+        if width == 4 and not is_fixed_year:
+            continue
+        powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+        chars.append((component[..., np.newaxis] // powers % 10 + ord('0')).astype(np.uint8))
+    chars = np.ascontiguousarray(np.concatenate(chars, axis=-1))
+    strings = chars.view('S{}'.format(chars.shape[-1])).reshape(shape)
+    if not is_fixed_year:
+        strings = np.char.add(np.char.mod('%04d', year).astype(str), strings)
+    return strings
+
+
+def components2int(components):
+    """
+    Converts date components as integers in format: %Y%m%d%H%M%s, all at once.
+
+    :param tuple components: The years, months, days, hours, minutes and seconds (as integer arrays)
+    :returns: The corresponding integers
+    :rtype: *numpy.array*
+
+    """
+    year, month, day, hour, minute, second = [np.asarray(c, dtype=np.int64) for c in components]
+    return ((((year * 100 + month) * 100 + day) * 100 + hour) * 100 + minute) * 100 + second
+
+
+def num2str(num_axis, units, calendar, iso_format=True):
+    """
+    Converts a numerical time axis in format: %Y%m%d %H:%M:%s.
+    Vectorized equivalent of ``dates2str(num2date(num_axis, units, calendar))``.
+
+    :param numpy.array num_axis: The numerical time axis following units
+    :param str units: The proper time units
+    :param str calendar: The NetCDF calendar attribute
+    :param boolean iso_format: ISO format date if True
+    :returns: The corresponding formatted strings
+    :rtype: *numpy.array* or *str*
+
+    """
+    strings = components2str(num2components(num_axis, units, calendar), iso_format)
+    return strings.tolist() if strings.ndim == 0 else strings
+
+
+def num2int(num_axis, units, calendar):
+    """
+    Converts a numerical time axis as integers in format: %Y%m%d%H%M%s.
+    Vectorized equivalent of ``dates2int(num2date(num_axis, units, calendar))``.
+
+    :param numpy.array num_axis: The numerical time axis following units
+    :param str units: The proper time units
+    :param str calendar: The NetCDF calendar attribute
+    :returns: The corresponding integers
+    :rtype: *numpy.array* or *int*
+
+    """
+    keys = components2int(num2components(num_axis, units, calendar))
+    return keys.tolist() if keys.ndim == 0 else keys
+
+
+class DateAxis(object):
+    """
+    Lazy view of a numerical time axis (or time boundaries) as formatted dates.
+    Dates are only decoded for the requested indices, so that the whole axis is never converted
+    unless explicitly required.
+
+    :param numpy.array num_axis: The numerical time axis (or [n, 2] time boundaries) following units
+    :param str units: The proper time units
+    :param str calendar: The NetCDF calendar attribute
+    :param boolean iso_format: ISO format date if True
+    :returns: The lazy date axis
+    :rtype: *DateAxis*
+
+    """
+
+    def __init__(self, num_axis, units, calendar, iso_format=True):
+        self.num_axis = num_axis
+        self.units = units
+        self.calendar = calendar
+        self.iso_format = iso_format
+
+    def __len__(self):
+        return len(self.num_axis)
+
+    def __getitem__(self, index):
+        return num2str(self.num_axis[index], units=self.units, calendar=self.calendar, iso_format=self.iso_format)
+
+    def __iter__(self):
+        for index in xrange(len(self)):
+            yield self[index]
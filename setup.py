@@ -20,7 +20,8 @@ setup(name='nctime',
                         'nco==0.0.3',
                         'esgconfigparser==0.1.17',
                         'fuzzywuzzy>=0.16.0',
-                        'python-Levenshtein==0.12.0'],
+                        'python-Levenshtein==0.12.0',
+                        'scandir>=1.5'],
       entry_points={'console_scripts': ['nctcck=nctime.nctcck:main',
                                         'nctxck=nctime.nctxck:main']
                     },
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Tests of the time axis checker.
+
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+from netCDF4 import Dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REF_UNITS = 'days since 1850-01-01 00:00:00'
+
+INI = """[project:cmip6]
+filename_format = %(variable_id)s_%(table_id)s_%(source_id)s_%(experiment_id)s_%(variant_label)s_%(grid_label)s[_%(period_start)s-%(period_end)s].nc
+"""
+
+
+def make_file(directory, units):
+    """
+    Writes a daily CMIP6-like file of ten time steps.
+
+    :param str directory: The output directory
+    :param str units: The time units
+    :returns: The file full path
+    :rtype: *str*
+
+    """
+    ffp = os.path.join(directory, 'tas_day_IPSL_hist_r1i1p1f1_gr_18500101-18500110.nc')
+    nc = Dataset(ffp, 'w')
+    nc.table_id = 'day'
+    nc.frequency = 'day'
+    nc.createDimension('time', None)
+    nc.createDimension('bnds', 2)
+    time = nc.createVariable('time', 'f8', ('time',))
+    time.units = units
+    time.calendar = 'noleap'
+    time.bounds = 'time_bnds'
+    time[:] = np.arange(10) + 0.5
+    bounds = nc.createVariable('time_bnds', 'f8', ('time', 'bnds'))
+    bounds[:] = np.column_stack((np.arange(10), np.arange(1, 11)))
+    tas = nc.createVariable('tas', 'f4', ('time',))
+    tas.cell_methods = 'area: mean time: mean'
+    tas[:] = np.zeros(10)
+    nc.close()
+    return ffp
+
+
+def nctxck(*args):
+    """
+    Runs nctxck in a separate process.
+
+    :returns: The return code
+    :rtype: *int*
+
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ROOT] + filter(None, [env.get('PYTHONPATH')]))
+    with open(os.devnull, 'w') as devnull:
+        return subprocess.call([sys.executable, '-c', 'from nctime.nctxck import main; main()'] + list(args),
+                               env=env, stdout=devnull, stderr=devnull)
+
+
+class TestWriteCache(unittest.TestCase):
+    """
+    The metadata cache must not keep the verdict of a file fixed in place.
+
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.data = os.path.join(self.tmp, 'data')
+        self.ini = os.path.join(self.tmp, 'ini')
+        os.makedirs(self.data)
+        os.makedirs(self.ini)
+        with open(os.path.join(self.ini, 'esg.cmip6.ini'), 'w') as f:
+            f.write(INI)
+        self.args = ['-i', self.ini, '--project', 'cmip6', '--units', REF_UNITS, '--calendar', 'noleap',
+                     '--cache-dir', os.path.join(self.tmp, 'cache'), '--max-processes', '1', '--no-color']
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_fixed_units(self):
+        ffp = make_file(self.data, units='days since 1850-1-1')
+        self.assertNotEqual(nctxck(self.data, *self.args), 0)
+        nctxck(self.data, '--write', *self.args)
+        with Dataset(ffp) as nc:
+            self.assertEqual(nc.variables['time'].units, REF_UNITS)
+        self.assertEqual(nctxck(self.data, *self.args), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
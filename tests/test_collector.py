@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Tests of the data collector.
+
+"""
+
+import os
+import random
+import re
+import shutil
+import tempfile
+import unittest
+
+from nctime.utils.collector import Collector, FilterCollection
+
+PATTERNS = ['^a', 'b$', '(x)\\1', '(?P<n>c)', '(?i)D', 'e|f', '^.*\\.nc$', '\\bg', 'h', re.compile('A', re.I), 'a',
+            '^$', '(?:y)+z', '(_fx_|_fixed_|_fx.|_fixed.|_.fx_)', '^\\..*$']
+
+
+def reference(filters, string):
+    """
+    Evaluates a string against each filter separately (i.e., without any compiled engine).
+
+    :param list filters: The regular expressions with their inclusive flag
+    :param str string: The string to test
+    :returns: True if the string passes all the filters
+    :rtype: *boolean*
+
+    """
+    return all([bool(re.search(regex, string)) == inclusive for regex, inclusive in filters])
+
+
+class TestFilterCollection(unittest.TestCase):
+    """
+    The compiled filter engine has to give the same verdicts as the filters evaluated one by one.
+
+    """
+
+    def test_random_filters(self):
+        rng = random.Random(0)
+        strings = [''.join([rng.choice('abcdefghxyzAD._ \n') for _ in range(rng.randint(0, 10))])
+                   for _ in range(1000)]
+        strings.extend(['', 'xx', 'a.nc', 'yz', '.a.nc', 'tas_fx_a.nc'])
+        for trial in range(300):
+            filters = [(rng.choice(PATTERNS), rng.random() < 0.5) for _ in range(rng.randint(1, 5))]
+            collection = FilterCollection(cache=bool(trial % 2))
+            for regex, inclusive in filters:
+                collection.add(regex=regex, inclusive=inclusive)
+            for string in strings * 2:
+                self.assertEqual(collection(string), reference(filters, string), (filters, string))
+
+
+class TestManifest(unittest.TestCase):
+    """
+    The files listed in a manifest are read without walking directories.
+
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def collect(self, lines):
+        manifest = os.path.join(self.tmp, 'manifest')
+        with open(manifest, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        sources = Collector(sources=list(), manifest=manifest)
+        sources.FileFilter.add(regex='^.*\.nc$', inclusive=True)
+        return [ffp for ffp in sources]
+
+    def test_columns(self):
+        self.assertEqual(self.collect(['/data/a.nc',
+                                       '/data/b.nc 1024 1530000000.5',
+                                       '/data/c d.nc 1024 1530000000',
+                                       '# /data/comment.nc',
+                                       '',
+                                       '/data/e.txt']),
+                         ['/data/a.nc', '/data/b.nc', '/data/c d.nc'])
+
+    def test_trailing_number(self):
+        self.assertEqual(self.collect(['/data/run 1.nc', '/data/run 1']), ['/data/run 1.nc'])
+        sources = Collector(sources=list(), manifest=os.path.join(self.tmp, 'manifest'))
+        self.assertEqual([ffp for ffp in sources], ['/data/run 1.nc', '/data/run 1'])
+
+    def test_mapfile(self):
+        self.assertEqual(self.collect(['cmip6.CMIP.IPSL#20180101 | /data/a.nc | 1024 | mod_time=1530000000.0 | '
+                                       'checksum=abc | checksum_type=SHA256']),
+                         ['/data/a.nc'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Tests of the time coverage checker.
+
+"""
+
+import random
+import unittest
+
+import nctime.overlap.main as main
+from nctime.overlap.handler import Graph
+from nctime.utils.custom_print import Print
+
+
+def random_layout(rng):
+    """
+    Draws a random chunk layout of a dataset.
+
+    :param random.Random rng: The random generator
+    :returns: The files (name, start, end, next) and the period start and end dates
+    :rtype: *tuple*
+
+    """
+    step = rng.choice([1, 100])
+    layout = list()
+    for i in range(rng.randint(1, 30)):
+        start = rng.randint(0, 40) * step
+        end = start + rng.randint(0, 15) * step
+        layout.append(('f{:03d}_{}.nc'.format(rng.randint(0, 999), i), start, end, end + step))
+    return layout, rng.choice([None, 0, 5 * step, -step]), rng.choice([None, 30 * step, 80 * step])
+
+
+def evaluate(backend, layout, period_start, period_end):
+    """
+    Builds and evaluates the graph of a dataset with a backend.
+
+    :param str backend: The graph backend
+    :param list layout: The files (name, start, end, next)
+    :param int period_start: The period start date
+    :param int period_end: The period end date
+    :returns: The nodes path, the partial and full overlaps
+    :rtype: *tuple*
+
+    """
+    main.graph = Graph(backend=backend)
+    main.patterns = dict()
+    main.resolve = False
+    main.period_start, main.period_end = period_start, period_end
+    main.graph.set_graph('dataset')
+    for name, start, end, next in layout:
+        main.graph.add_node('dataset', name, start, end, next, name)
+    main.create_edges('dataset')
+    return main.evaluate_graph('dataset')
+
+
+class TestGraphBackends(unittest.TestCase):
+    """
+    The "numpy" and "networkx" graph backends have to find the same path and overlaps on randomized chunk layouts.
+
+    """
+
+    def setUp(self):
+        Print.DEBUG = False
+
+    def test_backends(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            layout, period_start, period_end = random_layout(rng)
+            path, partial, full = evaluate('networkx', layout, period_start, period_end)
+            other_path, other_partial, other_full = evaluate('numpy', layout, period_start, period_end)
+            self.assertEqual(path, other_path, layout)
+            self.assertEqual(partial, other_partial, layout)
+            self.assertEqual(full, other_full, layout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    :platform: Unix
+    :synopsis: Tests of the time axis methods.
+
+"""
+
+import unittest
+
+import netCDF4
+import numpy as np
+from netcdftime import datetime
+
+from nctime.utils.time import calendar_offsets, components2str, date2days, date2str, days2date, num2components, \
+    num2num
+
+CALENDARS = ['standard', 'gregorian', 'proleptic_gregorian', 'julian', 'noleap', '365_day', 'all_leap', '366_day',
+             '360_day']
+
+# Days since 1582-10-01 from the third century BC (with negative years and no year 0 in real-world calendars)
+# to the fourth millennium, densely around year 1 and around the Gregorian reform of 1582-10-15
+DAYS = np.concatenate([np.arange(-650000, 800000, 997), np.arange(-578500, -577000), np.arange(-400, 400)])
+
+
+def components(dates):
+    """
+    Extracts the date components as integer columns.
+
+    :param list dates: A list of datetime or phony datetime objects
+    :returns: The years, months, days, hours, minutes and seconds
+    :rtype: *list*
+
+    """
+    return [np.array([getattr(date, c) for date in dates])
+            for c in ['year', 'month', 'day', 'hour', 'minute', 'second']]
+
+
+class TestCalendars(unittest.TestCase):
+    """
+    The calendar arithmetic has to give the same dates and numbers as ``netcdftime``, for every CF calendar.
+
+    """
+
+    def test_date2days(self):
+        for calendar in CALENDARS:
+            year, month, day = components(netCDF4.num2date(DAYS, 'days since 1582-10-01', calendar))[:3]
+            days = date2days(year, month, day, calendar) - date2days(1582, 10, 1, calendar)
+            self.assertEqual(days.tolist(), DAYS.tolist(), calendar)
+
+    def test_days2date(self):
+        for calendar in CALENDARS:
+            expected = components(netCDF4.num2date(DAYS, 'days since 1582-10-01', calendar))[:3]
+            year, month, day = days2date(date2days(1582, 10, 1, calendar) + DAYS, calendar)
+            for c, e in zip([year, month, day], expected):
+                self.assertEqual(c.tolist(), e.tolist(), calendar)
+
+    def test_num2components(self):
+        for calendar in CALENDARS:
+            for units, num_axis in [('days since 1582-10-01', DAYS + 0.25),
+                                    ('hours since 1582-10-04 18:00:00', np.arange(-2000, 2000, 7.5)),
+                                    ('seconds since 1582-10-01 00:00:00', np.arange(-36500, 36500, 7) * 86400. + 3661)]:
+                expected = components(netCDF4.num2date(num_axis, units, calendar))
+                for c, e in zip(num2components(num_axis, units, calendar), expected):
+                    self.assertEqual(c.tolist(), e.tolist(), '{} in {} calendar'.format(units, calendar))
+
+    def test_calendar_offsets(self):
+        for calendar in CALENDARS:
+            for units, first, last in [('months since 1575-03-15', -60, 240), ('years since 1550-06-01', -40, 80)]:
+                name, origin = units.split(' since ')[0], datetime(*[int(c) for c in units[-10:].split('-')])
+                index = np.arange(first, last + 1)
+                if name == 'years':
+                    dates = [datetime(origin.year + i, origin.month, origin.day) for i in index]
+                else:
+                    dates = [datetime(origin.year + (origin.month - 1 + i) // 12, (origin.month - 1 + i) % 12 + 1,
+                                      origin.day) for i in index]
+                expected = netCDF4.date2num(dates, units.replace(name, 'days'), calendar)
+                # Grow the memoized table from the middle, then both ways
+                offsets = [calendar_offsets(units, calendar, 0, 10), calendar_offsets(units, calendar, first, -1),
+                           calendar_offsets(units, calendar, 11, last), calendar_offsets(units, calendar, first, last)]
+                self.assertEqual(np.concatenate([offsets[1], offsets[0], offsets[2]]).tolist(), expected.tolist(),
+                                 calendar)
+                self.assertEqual(offsets[0].tolist(), expected[-first:11 - first].tolist(), calendar)
+                self.assertEqual(offsets[3].tolist(), expected.tolist(), calendar)
+
+    def test_num2num(self):
+        for calendar in CALENDARS:
+            # Months and years: integer and half steps lie at and between the month or year starts
+            # Back into months or years, only the month or year starts are exact
+            for units in ['months since 1575-03-15', 'years since 1550-06-01']:
+                name = units.split(' since ')[0]
+                days = calendar_offsets(units, calendar, -40, 80)
+                num_axis = np.arange(-40, 80, 0.5)
+                expected = (days[:-1, np.newaxis] + np.array([0., 0.5]) * np.diff(days)[:, np.newaxis]).ravel()
+                self.assertEqual(num2num(num_axis, units, units.replace(name, 'days'), calendar).tolist(),
+                                 expected.tolist(), '{} in {} calendar'.format(units, calendar))
+                self.assertEqual(num2num(expected[::2], units.replace(name, 'days'), units, calendar).tolist(),
+                                 num_axis[::2].tolist(), '{} in {} calendar'.format(units, calendar))
+            # Fixed-length units with the same or another reference date
+            # Dates before and after the reform cannot be subtracted by netcdftime in the standard calendar
+            num_axis = np.arange(-20000, 20000, 13.)
+            for units, new_units in [('hours since 1850-01-01', 'days since 1850-01-01 00:00:00'),
+                                     ('hours since 1850-01-01', 'minutes since 1900-01-01 06:00:00')]:
+                expected = netCDF4.date2num(netCDF4.num2date(num_axis, units, calendar), new_units, calendar)
+                self.assertTrue(np.allclose(num2num(num_axis, units, new_units, calendar), expected, rtol=0,
+                                            atol=1e-6), '{} in {} calendar'.format(new_units, calendar))
+
+
+class TestComponents2Str(unittest.TestCase):
+    """
+    The vectorized formatting has to give the same strings as the formatting of each date.
+
+    """
+
+    def test_years(self):
+        years = [-12345, -1000, -999, -5, 0, 5, 999, 1850, 9999, 10000, 123456]
+        for iso_format in [True, False]:
+            for year in years:
+                expected = date2str(datetime(year, 3, 4, 5, 6, 7), iso_format)
+                self.assertEqual(components2str((year, 3, 4, 5, 6, 7), iso_format).tolist(), expected)
+            components = (np.array(years),) + tuple(np.full(len(years), c) for c in [3, 4, 5, 6, 7])
+            expected = [date2str(datetime(year, 3, 4, 5, 6, 7), iso_format) for year in years]
+            self.assertEqual(components2str(components, iso_format).tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()